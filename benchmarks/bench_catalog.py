@@ -0,0 +1,256 @@
+"""Замеры запросов каталога и построения страниц на синтетических базах 1k/100k/1M записей.
+
+Для каждого размера создаётся (или берётся готовая из --data-dir) база с терминами
+и курсами, и в отдельном процессе с DB_NAME, указывающим на эту базу, замеряются
+функции db_manager, сборка страницы курсов и клавиатура удаления админки — на
+первой странице и на глубоких (через OFFSET и через курсор). Результат — JSON.
+
+Запуск:
+    python -m benchmarks.bench_catalog --sizes 1000,100000 --output bench.json
+    python -m benchmarks.bench_catalog --sizes 1000,100000 --baseline bench.json
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+DEFAULT_SIZES = "1000,100000,1000000"
+LETTERS = "абвгдежзиклмнопрстуфхцчшэюя"
+DEEP_OFFSET = 20  # насколько строк от конца таблицы брать «глубокую» страницу
+
+
+def _stats(timings: List[float]) -> Dict[str, Any]:
+    timings = sorted(timings)
+    return {
+        "runs": len(timings),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 4),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 4),
+        "max_ms": round(timings[-1] * 1000, 4),
+    }
+
+
+async def measure(call: Callable[[], Any], repeat: int, budget: float) -> Dict[str, Any]:
+    """Выполняет call до repeat раз (но не дольше budget секунд, минимум один раз)."""
+    timings = []
+    deadline = time.perf_counter() + budget
+    while len(timings) < repeat and (not timings or time.perf_counter() < deadline):
+        started = time.perf_counter()
+        result = call()
+        if inspect.isawaitable(result):
+            await result
+        timings.append(time.perf_counter() - started)
+    return _stats(timings)
+
+
+# ---------- Генерация базы (в процессе замера, через init_db) ----------
+
+def _shuffled(count: int, seed: int) -> List[int]:
+    # Имена вставляются не в алфавитном порядке, чтобы порядок индекса не совпадал с rowid
+    numbers = list(range(count))
+    random.Random(seed).shuffle(numbers)
+    return numbers
+
+
+def generate(size: int) -> float:
+    """Наполняет пустую базу DB_NAME: size терминов и size курсов. Возвращает время в секундах."""
+    from database import db_manager as db
+
+    started = time.perf_counter()
+    db.init_db()
+    with db.get_db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO terms (term, definition, first_letter) VALUES (?, ?, ?)",
+            ((term, f"Определение термина {number}", db.term_first_letter(term))
+             for number in _shuffled(size, 1)
+             for term in (f"{LETTERS[number % len(LETTERS)].upper()}термин {number:07d}",))
+        )
+        conn.executemany(
+            "INSERT INTO courses (name, description, link) VALUES (?, ?, ?)",
+            ((f"Курс {number:07d}", f"Описание курса {number}", f"https://example.com/courses/{number}")
+             for number in _shuffled(size, 2))
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+    return time.perf_counter() - started
+
+
+def _is_generated(path: str, size: int) -> bool:
+    if not os.path.exists(path):
+        return False
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            return all(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == size
+                       for table in ("terms", "courses"))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+
+
+# ---------- Замеры (выполняются в дочернем процессе с DB_NAME) ----------
+
+def _deep_rowid(conn: sqlite3.Connection, table: str, key: str, size: int) -> int:
+    """rowid строки в DEEP_OFFSET строках от конца алфавитного порядка — курсор глубокой страницы."""
+    return conn.execute(
+        f"SELECT rowid FROM {table} ORDER BY {key} LIMIT 1 OFFSET ?", (max(0, size - DEEP_OFFSET),)
+    ).fetchone()[0]
+
+
+async def run_benchmarks(size: int, repeat: int, budget: float) -> Dict[str, Any]:
+    from database import db_manager as db
+    from database.catalog_cache import catalog_cache
+    from utils.pagination import ITEMS_PER_PAGE, rendered_pages, render_catalog_page
+    from utils.pagination_admin import ADMIN_DELETE_ITEMS_PER_PAGE, create_paginated_keyboard
+
+    with db.get_db_connection() as conn:
+        course_cursor = f"n{_deep_rowid(conn, 'courses', 'name, id', size)}"
+        term_cursor = f"n{_deep_rowid(conn, 'terms', 'term, rowid', size)}"
+        letter = LETTERS[0]
+        letter_size = conn.execute("SELECT COUNT(*) FROM terms WHERE first_letter = ?", (letter,)).fetchone()[0]
+        letter_cursor = "n" + str(conn.execute(
+            "SELECT rowid FROM terms WHERE first_letter = ? ORDER BY term, rowid LIMIT 1 OFFSET ?",
+            (letter, max(0, letter_size - DEEP_OFFSET))
+        ).fetchone()[0])
+
+    admin_pages = max(1, (size + ADMIN_DELETE_ITEMS_PER_PAGE - 1) // ADMIN_DELETE_ITEMS_PER_PAGE)
+    catalog_pages = max(1, (size + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE)
+
+    def render(page: int, cursor=None):
+        # Холодный путь: без кэша каталога и кэша готовых страниц
+        catalog_cache.clear()
+        rendered_pages.clear()
+        return render_catalog_page("course", page, cursor)
+
+    def keyboard(items: List, page: int):
+        return create_paginated_keyboard(
+            items=items, page=page, items_per_page=ADMIN_DELETE_ITEMS_PER_PAGE, total_items=size,
+            pagination_callback_prefix="navigate_delete_course", item_callback_prefix="del_course_by_id",
+            item_id_index=0, item_name_index=1, item_cursor_index=2,
+        )
+
+    # Функции БД вызываются через .sync — замеряется сам запрос, без кэша и пула потоков
+    get_items_page = db.get_items_page.sync
+    shallow_items = get_items_page("course", 1, ADMIN_DELETE_ITEMS_PER_PAGE)
+    deep_items = get_items_page("course", admin_pages, ADMIN_DELETE_ITEMS_PER_PAGE)
+
+    cases = {
+        "get_total_items_count[course]": lambda: db.get_total_items_count.sync("course"),
+        "get_total_items_count[term]": lambda: db.get_total_items_count.sync("term"),
+        "get_items_page[course].shallow": lambda: get_items_page("course", 1, ADMIN_DELETE_ITEMS_PER_PAGE),
+        "get_items_page[course].deep_offset": lambda: get_items_page("course", admin_pages, ADMIN_DELETE_ITEMS_PER_PAGE),
+        "get_items_page[course].deep_cursor": lambda: get_items_page("course", admin_pages, ADMIN_DELETE_ITEMS_PER_PAGE, course_cursor),
+        "get_items_page[term].shallow": lambda: get_items_page("term", 1, ADMIN_DELETE_ITEMS_PER_PAGE),
+        "get_items_page[term].deep_offset": lambda: get_items_page("term", admin_pages, ADMIN_DELETE_ITEMS_PER_PAGE),
+        "get_items_page[term].deep_cursor": lambda: get_items_page("term", admin_pages, ADMIN_DELETE_ITEMS_PER_PAGE, term_cursor),
+        "get_terms_by_letter.shallow": lambda: db.get_terms_by_letter.sync(letter, ITEMS_PER_PAGE),
+        "get_terms_by_letter.deep_cursor": lambda: db.get_terms_by_letter.sync(letter, ITEMS_PER_PAGE, letter_cursor),
+        "get_terms_page.shallow": lambda: db.get_terms_page.sync(ITEMS_PER_PAGE),
+        "get_terms_page.deep_cursor": lambda: db.get_terms_page.sync(ITEMS_PER_PAGE, term_cursor),
+        "render_catalog_page.shallow": lambda: render(0),
+        "render_catalog_page.deep_offset": lambda: render(catalog_pages - 1),
+        "render_catalog_page.deep_cursor": lambda: render(catalog_pages - 1, course_cursor),
+        "render_catalog_page.cached": lambda: render_catalog_page("course", 0),
+        "create_paginated_keyboard.shallow": lambda: keyboard(shallow_items, 1),
+        "create_paginated_keyboard.deep": lambda: keyboard(deep_items, admin_pages),
+    }
+    return {name: await measure(call, repeat, budget) for name, call in cases.items()}
+
+
+def run_worker(size: int, repeat: int, budget: float) -> Dict[str, Any]:
+    from database.db_executor import shutdown_db_executor
+    from database.db_pool import DB_NAME, db_pool
+
+    generated_in = None
+    if not _is_generated(DB_NAME, size):
+        generated_in = round(generate(size), 2)
+    try:
+        results = asyncio.run(run_benchmarks(size, repeat, budget))
+    finally:
+        shutdown_db_executor()
+        db_pool.close_all()
+    return {"db_size_mb": round(os.path.getsize(DB_NAME) / 1024 / 1024, 1), "generate_s": generated_in,
+            "results": results}
+
+
+# ---------- Запуск по размерам и сравнение с прошлым результатом ----------
+
+def run_size(size: int, data_dir: str, args: argparse.Namespace) -> Dict[str, Any]:
+    path = os.path.join(data_dir, f"catalog_{size}.db")
+    env = dict(os.environ, DB_NAME=path)
+    command = [sys.executable, "-m", "benchmarks.bench_catalog", "--worker", str(size),
+               "--repeat", str(args.repeat), "--budget", str(args.budget)]
+    output = subprocess.run(command, env=env, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output)
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Строки о замедлениях больше tolerance (доля) относительно baseline по p50."""
+    regressions = []
+    for size, current in report["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size, {}).get("results", {})
+        for name, stats in current["results"].items():
+            old = previous.get(name)
+            if old and old["p50_ms"] > 0 and stats["p50_ms"] > old["p50_ms"] * (1 + tolerance):
+                regressions.append(f"{size:>8} {name}: {old['p50_ms']:.3f} -> {stats['p50_ms']:.3f} мс")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="размеры каталога через запятую")
+    parser.add_argument("--repeat", type=int, default=50, help="максимум повторов на замер")
+    parser.add_argument("--budget", type=float, default=2.0, help="максимум секунд на замер")
+    parser.add_argument("--data-dir", help="каталог для сгенерированных баз (по умолчанию временный)")
+    parser.add_argument("--output", help="файл для JSON (по умолчанию stdout)")
+    parser.add_argument("--baseline", help="JSON прошлого запуска: вывести замедления и вернуть код 1")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое замедление p50 (0.2 = 20%%)")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        json.dump(run_worker(args.worker, args.repeat, args.budget), sys.stdout)
+        return
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or tmp
+        os.makedirs(data_dir, exist_ok=True)
+        for size in sizes:
+            print(f"Каталог {size} записей...", file=sys.stderr)
+            report["sizes"][str(size)] = run_size(size, data_dir, args)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"Замедление: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Сравнение: новое соединение на каждый запрос против пула соединений.
+
+Запуск:
+    python -m benchmarks.bench_pool --rows 50000 --queries 5000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from database.db_pool import ConnectionPool
+
+PRAGMAS = {
+    "busy_timeout": 5000,
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -16000,
+}
+
+QUERY = "SELECT id, name, description, link FROM courses WHERE id > ? ORDER BY id LIMIT 5"
+
+
+def create_database(path: str, rows: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE courses (id INTEGER PRIMARY KEY, name TEXT, description TEXT, link TEXT)")
+    conn.executemany(
+        "INSERT INTO courses (name, description, link) VALUES (?, ?, ?)",
+        ((f"Курс {i}", f"Описание курса {i}", f"https://example.com/{i}") for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def bench_connect_per_request(path: str, queries: int, rows: int) -> float:
+    start = time.perf_counter()
+    for i in range(queries):
+        conn = sqlite3.connect(path)
+        conn.execute(QUERY, (i % rows,)).fetchall()
+        conn.close()
+    return time.perf_counter() - start
+
+
+def bench_pool(path: str, queries: int, rows: int) -> float:
+    pool = ConnectionPool(path, 1, PRAGMAS)
+    start = time.perf_counter()
+    for i in range(queries):
+        with pool.connection() as conn:
+            conn.execute(QUERY, (i % rows,)).fetchall()
+    elapsed = time.perf_counter() - start
+    pool.close_all()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        create_database(path, args.rows)
+
+        results = {
+            "connect_per_request": bench_connect_per_request(path, args.queries, args.rows),
+            "pooled": bench_pool(path, args.queries, args.rows),
+        }
+
+    for name, elapsed in results.items():
+        per_query_us = elapsed / args.queries * 1_000_000
+        print(f"{name:<22} {elapsed:8.3f} s  {per_query_us:8.1f} мкс/запрос")
+    print(f"Ускорение: {results['connect_per_request'] / results['pooled']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
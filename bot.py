@@ -1,16 +1,31 @@
 import logging
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 from dotenv import load_dotenv
 import os
 import asyncio
 
 from handlers.main_handler import router as handlers_router
 from handlers.admin_handlers import router as admin_router
-from database.db_manager import init_db
-from handlers.admin_handlers import check_admin_access  
-from database.db_manager import get_items_page, get_total_items_count  
-from utils.pagination_admin import register_pagination_handlers 
+from handlers.search_handler import router as search_router
+from handlers.inline_handler import router as inline_router
+from database.db_manager import init_db, load_term_index
+from database.db_executor import run_db, shutdown_db_executor
+from database.db_pool import db_pool
+from database.fsm_storage import fsm_storage
+from database.db_manager import get_items_page, get_total_items_count, delete_items
+from utils.pagination_admin import register_pagination_handlers
 from utils.pagination import router as pagination_router
+from utils.rate_limiter import outbound_limiter
+from utils.retry import retry_middleware
+from utils.edit_guard import edit_guard
+from utils.admin_access import admin_registry
+from utils.metrics import api_metrics, setup_metrics, start_metrics_server
+from utils.tracing import setup_tracing
+from utils.update_capture import setup_update_capture
 
 logging.basicConfig(
     level=logging.ERROR,
@@ -20,29 +35,105 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Режим получения обновлений: "polling" (по умолчанию) или "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+
+# Настройки webhook-режима
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # публичный адрес, например https://bot.example.com
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
+WEBAPP_HOST = os.getenv("WEBAPP_HOST", "0.0.0.0")
+WEBAPP_PORT = int(os.getenv("WEBAPP_PORT", os.getenv("PORT", "8080")))
+
+# Адрес Bot API (например, локального telegram-bot-api или loadtest/fake_api.py); пусто — api.telegram.org
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "")
+
+
+def create_bot(token: str, api_url: str = TELEGRAM_API_URL) -> Bot:
+    """Создаёт бота с цепочкой middleware исходящих запросов."""
+    session = AiohttpSession(api=TelegramAPIServer.from_base(api_url)) if api_url else None
+    bot = Bot(token=token, session=session)
+    # Правки, не меняющие сообщение, отсекаются до очереди и повторов
+    bot.session.middleware(edit_guard)
+    # Повторы снаружи очереди: каждая новая попытка снова ждёт своей очереди
+    bot.session.middleware(retry_middleware)
+    # Все исходящие запросы к Bot API проходят через очередь с учётом лимитов Telegram
+    bot.session.middleware(outbound_limiter)
+    # Замер самого HTTP-запроса к Bot API, без ожидания в очереди
+    bot.session.middleware(api_metrics)
+    return bot
+
+
+def create_dispatcher() -> Dispatcher:
+    """Создаёт диспетчер и подключает все роутеры бота (один раз на процесс)."""
+    dp = Dispatcher(storage=fsm_storage)
+
+    dp.include_router(handlers_router)
+    dp.include_router(search_router)
+    dp.include_router(inline_router)
+    dp.include_router(admin_router)
+    dp.include_router(pagination_router)
+
+    register_pagination_handlers(admin_router, get_items_page, get_total_items_count, delete_items)
+    setup_metrics(dp)
+    setup_update_capture(dp)
+    setup_tracing(dp)
+    return dp
+
+
+async def run_webhook(bot: Bot, dp: Dispatcher):
+    """Принимает обновления через aiohttp-сервер вместо long polling.
+
+    Если WEBHOOK_URL не задан, webhook в Telegram не регистрируется — так сервер
+    можно проверить локально, отправляя JSON обновлений POST-запросом на WEBHOOK_PATH.
+    """
+    app = web.Application()
+    SimpleRequestHandler(dispatcher=dp, bot=bot, secret_token=WEBHOOK_SECRET).register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+
+    if WEBHOOK_URL:
+        await bot.set_webhook(
+            f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            allowed_updates=dp.resolve_used_update_types()
+        )
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, WEBAPP_HOST, WEBAPP_PORT)
+    await site.start()
+    logger.info(f"Webhook-сервер запущен на {WEBAPP_HOST}:{WEBAPP_PORT}{WEBHOOK_PATH}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
 async def main():
     """Основная функция запуска бота"""
     try:
         BOT_TOKEN = os.getenv("BOT_TOKEN")
         if not BOT_TOKEN:
             raise ValueError("BOT_TOKEN не найден в переменных окружения.")
-        
-        bot = Bot(token=BOT_TOKEN)
-        dp = Dispatcher()
-
-        dp.include_router(handlers_router)
-        dp.include_router(admin_router)
-        dp.include_router(pagination_router)
 
-        register_pagination_handlers(admin_router, check_admin_access, get_items_page, get_total_items_count)
+        bot = create_bot(BOT_TOKEN)
+        dp = create_dispatcher()
 
         try:
-            init_db()
+            await run_db(init_db)
+            await run_db(load_term_index)
+            await admin_registry.reload()
         except Exception as db_error:
             logger.error(f"Ошибка инициализации БД: {db_error}")
             raise
+        fsm_storage.start_compaction()
+        metrics_runner = await start_metrics_server()
 
-        await dp.start_polling(bot)
+        if BOT_MODE == "webhook":
+            await run_webhook(bot, dp)
+        else:
+            await bot.delete_webhook()
+            await dp.start_polling(bot)
 
     except KeyboardInterrupt:
         logger.error("Бот остановлен пользователем.")
@@ -52,6 +143,11 @@ async def main():
     finally:
         logger.error("Завершение работы бота...")
         await bot.close() if 'bot' in locals() else None
+        await fsm_storage.close()
+        if 'metrics_runner' in locals() and metrics_runner:
+            await metrics_runner.cleanup()
+        shutdown_db_executor()
+        db_pool.close_all()
 
 if __name__ == "__main__":
     try:
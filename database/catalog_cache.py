@@ -0,0 +1,117 @@
+import functools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "1024"))
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "600"))  # секунды
+
+
+class CatalogCache:
+    """Кэш чтений каталога (курсы, ресурсы, термины, группы) с вытеснением LRU и TTL.
+
+    Ключ записи — кортеж, первый элемент которого — категория. Функции записи
+    в db_manager вызывают ``invalidate(категория)``; версия категории не даёт
+    сохранить результат запроса, начатого до изменения данных.
+    """
+
+    def __init__(self, maxsize: int = CATALOG_CACHE_SIZE, ttl: float = CATALOG_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._listeners: List[Callable[[str], None]] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def version(self, category: str) -> int:
+        with self._lock:
+            return self._versions.get(category, 0)
+
+    def put(self, key: Tuple, value: Any, version: int) -> None:
+        with self._lock:
+            if self._versions.get(key[0], 0) != version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, category: str) -> None:
+        """Сбрасывает все записи категории (вызывается после добавления/удаления)."""
+        with self._lock:
+            self._versions[category] = self._versions.get(category, 0) + 1
+            for key in [key for key in self._entries if key[0] == category]:
+                del self._entries[key]
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(category)
+            except Exception as e:
+                logger.error(f"Ошибка обработчика сброса кэша для категории {category}: {e}")
+
+    def add_invalidation_listener(self, listener: Callable[[str], None]) -> None:
+        """Регистрирует функцию, вызываемую при изменении категории."""
+        self._listeners.append(listener)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+catalog_cache = CatalogCache()
+
+
+def cached(category: Union[str, Callable[..., str]], cache: CatalogCache = catalog_cache):
+    """Декоратор для асинхронных функций чтения: результат берётся из кэша (по умолчанию catalog_cache).
+
+    ``category`` — имя категории или функция, получающая её из аргументов вызова.
+    Возвращаемые значения общие для всех вызывающих, изменять их нельзя.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        async def wrapper(*args: Hashable, **kwargs: Hashable) -> Any:
+            name = category(*args, **kwargs) if callable(category) else category
+            key = (name, func.__name__, args, tuple(sorted(kwargs.items())))
+            found, value = cache.get(key)
+            if found:
+                return value
+            version = cache.version(name)
+            value = await func(*args, **kwargs)
+            cache.put(key, value, version)
+            return value
+
+        return wrapper
+    return decorator
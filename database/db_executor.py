@@ -0,0 +1,52 @@
+import asyncio
+import functools
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from utils.metrics import timed_db_call
+from utils.tracing import record_stage
+
+logger = logging.getLogger(__name__)
+
+# Количество потоков, выполняющих запросы к SQLite
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "4"))
+# Максимум задач, которые одновременно находятся в очереди и в работе.
+# Если очередь заполнена, хэндлер ждёт свободного места, а не раздувает память.
+DB_QUEUE_SIZE = int(os.getenv("DB_QUEUE_SIZE", "100"))
+
+_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="db")
+_queue_slots = asyncio.Semaphore(DB_QUEUE_SIZE)
+
+
+async def run_db(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Выполняет синхронную функцию работы с БД в пуле потоков, не блокируя event loop."""
+    submitted = time.perf_counter()
+    try:
+        async with _queue_slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_executor, functools.partial(timed_db_call(func, submitted), *args, **kwargs))
+    finally:
+        # Время для трассы обновления (вместе с ожиданием в очереди)
+        record_stage("db", getattr(func, "__name__", "unknown"), time.perf_counter() - submitted)
+
+
+def db_task(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Декоратор: превращает синхронную функцию БД в корутину, выполняемую в пуле потоков.
+
+    Исходная синхронная функция доступна как ``func.sync`` (для скриптов и init_db).
+    """
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await run_db(func, *args, **kwargs)
+
+    wrapper.sync = func
+    return wrapper
+
+
+def shutdown_db_executor() -> None:
+    """Дожидается завершения запросов и останавливает пул потоков БД."""
+    _executor.shutdown(wait=True)
+    logger.info("Пул потоков БД остановлен.")
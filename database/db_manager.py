@@ -1,71 +1,248 @@
+import hashlib
+import re
 import sqlite3
 import os
-from typing import List, Tuple, Any
+import time
+from typing import Dict, Iterable, Iterator, List, Tuple, Any, Optional
 import logging
 
+from database.db_executor import db_task
+from database.db_pool import db_pool, DB_NAME
+from database.catalog_cache import catalog_cache, cached
+from database.term_index import term_index
+from database.trigram_index import trigram_index
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-DB_NAME = "bot.db"
-
 def get_db_connection():
-    conn = sqlite3.connect(DB_NAME)
-    return conn
-
-def init_db():
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Создание таблицы курсов
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS courses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            description TEXT NOT NULL,
-            link TEXT NOT NULL
+    """Соединение из общего пула (использовать как контекстный менеджер)."""
+    return db_pool.connection()
+
+# --- Keyset-пагинация ---
+# Курсор передаётся в callback_data: "n<rowid>" — страница после строки,
+# "p<rowid>" — страница перед строкой, пустой курсор — первая страница.
+
+def parse_cursor(cursor: Optional[str]) -> Tuple[Optional[str], Optional[int]]:
+    if cursor and cursor[0] in ("n", "p") and cursor[1:].isdigit():
+        return cursor[0], int(cursor[1:])
+    return None, None
+
+def page_cursors(rows: List[Tuple], page: int, cursor: Optional[str], has_more: bool,
+                 rowid_index: int = 0) -> Tuple[Optional[str], Optional[str]]:
+    """Курсоры для кнопок «Назад» и «Вперёд» (None, если кнопка не нужна)."""
+    if not rows:
+        return None, None
+    direction, _ = parse_cursor(cursor)
+    if direction == "p":
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = page > 0, has_more
+    prev_cursor = f"p{rows[0][rowid_index]}" if has_prev else None
+    next_cursor = f"n{rows[-1][rowid_index]}" if has_next else None
+    return prev_cursor, next_cursor
+
+def _fetch_page(conn: sqlite3.Connection, table: str, columns: str, key: Tuple[str, ...], limit: int,
+                cursor: Optional[str] = None, offset: int = 0, where: str = "", params: tuple = ()) -> Tuple[List[Tuple], bool]:
+    """Возвращает (строки страницы, есть ли ещё строки в направлении движения).
+
+    С курсором выполняется поиск по индексу от ключа строки-курсора, поэтому
+    стоимость не зависит от глубины страницы. Без курсора используется offset
+    (первая страница и переход на произвольный номер страницы); offset — это
+    начало запрошенной страницы, он же используется, если строку-курсор удалили.
+    """
+    direction, rowid = parse_cursor(cursor)
+    key_sql = ", ".join(key)
+    conditions = [where] if where else []
+    query_params = list(params)
+    order = key_sql
+    backward = False
+    if direction:
+        cursor_key = conn.execute(f"SELECT {key_sql} FROM {table} WHERE rowid = ?", (rowid,)).fetchone()
+        if cursor_key is not None:
+            operator = ">" if direction == "n" else "<"
+            conditions.append(f"({key_sql}) {operator} ({', '.join('?' * len(key))})")
+            query_params.extend(cursor_key)
+            backward = direction == "p"
+            if backward:
+                order = ", ".join(f"{column} DESC" for column in key)
+            offset = 0
+    where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = conn.execute(
+        f"SELECT {columns} FROM {table} {where_sql} ORDER BY {order} LIMIT ? OFFSET ?",
+        (*query_params, limit + 1, offset)
+    ).fetchall()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backward:
+        rows.reverse()
+    elif direction == "p":
+        # Курсор «назад» на удалённую строку: has_more означает «есть строки раньше»
+        has_more = offset > 0
+    return rows, has_more
+
+def term_first_letter(term: str) -> str:
+    """Первая буква термина в casefold-форме (SQLite UPPER не работает с кириллицей)."""
+    return term.strip()[:1].casefold()[:1]
+
+def _migrate_terms_first_letter(cursor: sqlite3.Cursor) -> None:
+    """Добавляет в terms столбец first_letter с индексом и заполняет его для старых строк."""
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(terms)")]
+    if "first_letter" not in columns:
+        cursor.execute("ALTER TABLE terms ADD COLUMN first_letter TEXT")
+    rows = cursor.execute("SELECT rowid, term FROM terms WHERE first_letter IS NULL").fetchall()
+    if rows:
+        cursor.executemany(
+            "UPDATE terms SET first_letter = ? WHERE rowid = ?",
+            ((term_first_letter(term), rowid) for rowid, term in rows)
         )
+        logger.info(f"Заполнен first_letter для {len(rows)} терминов.")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_terms_first_letter ON terms (first_letter, term)")
+
+# --- Полнотекстовый поиск (FTS5) ---
+# Одна таблица search_index для терминов, курсов и ресурсов. rowid записи
+# кодирует источник: rowid_источника * 4 + код вида, поэтому триггеры
+# обновляют и удаляют записи индекса по rowid, без просмотра таблицы.
+SEARCH_KINDS = {0: "term", 1: "course", 2: "resource"}
+SEARCH_SOURCES = (
+    # (таблица, код вида, ключ строки, заголовок, текст)
+    ("terms", 0, "rowid", "term", "definition"),
+    ("courses", 1, "id", "name", "description"),
+    ("resources", 2, "id", "name", "description"),
+)
+
+def _init_search_index(cursor: sqlite3.Cursor) -> None:
+    """Создаёт FTS5-индекс и триггеры синхронизации; перестраивает индекс, если он разошёлся с таблицами."""
+    cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        title, body, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """)
+    for table, code, key, title, body in SEARCH_SOURCES:
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO search_index (rowid, title, body) VALUES (new.{key} * 4 + {code}, new.{title}, new.{body});
+        END
         """)
-
-        # Создание таблицы ресурсов
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS resources (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            description TEXT NOT NULL,
-            link TEXT NOT NULL
-        )
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN
+            DELETE FROM search_index WHERE rowid = old.{key} * 4 + {code};
+        END
         """)
-
-        # Создание таблицы терминов
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS terms (
-            term TEXT PRIMARY KEY, -- Термин как первичный ключ (строка)
-            definition TEXT NOT NULL
-        )
+        cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE ON {table} BEGIN
+            DELETE FROM search_index WHERE rowid = old.{key} * 4 + {code};
+            INSERT INTO search_index (rowid, title, body) VALUES (new.{key} * 4 + {code}, new.{title}, new.{body});
+        END
         """)
 
-        # Создание таблицы групп
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS groups (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE, -- Используем 'name' как уникальное имя группы
-            description TEXT NOT NULL,
-            link TEXT NOT NULL -- Предполагаем, что группа тоже может иметь ссылку
+    indexed = cursor.execute("SELECT COUNT(*) FROM search_index").fetchone()[0]
+    expected = sum(cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table, *_ in SEARCH_SOURCES)
+    if indexed != expected:
+        _rebuild_search_index(cursor)
+
+def _rebuild_search_index(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("DELETE FROM search_index")
+    for table, code, key, title, body in SEARCH_SOURCES:
+        cursor.execute(
+            f"INSERT INTO search_index (rowid, title, body) SELECT {key} * 4 + {code}, {title}, {body} FROM {table}"
         )
-        """)
+    logger.info("Поисковый индекс перестроен.")
+
+def build_search_query(text: str) -> str:
+    """Преобразует ввод пользователя в запрос FTS5: все слова, поиск по префиксу."""
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{word}"*' for word in words)
+
+def init_db():
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            # Создание таблицы курсов
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS courses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                description TEXT NOT NULL,
+                link TEXT NOT NULL
+            )
+            """)
+
+            # Создание таблицы ресурсов
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS resources (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                description TEXT NOT NULL,
+                link TEXT NOT NULL
+            )
+            """)
+
+            # Создание таблицы терминов
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS terms (
+                term TEXT PRIMARY KEY, -- Термин как первичный ключ (строка)
+                definition TEXT NOT NULL
+            )
+            """)
+
+            # Создание таблицы групп
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS groups (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE, -- Используем 'name' как уникальное имя группы
+                description TEXT NOT NULL,
+                link TEXT NOT NULL -- Предполагаем, что группа тоже может иметь ссылку
+            )
+            """)
+
+            # Индексы для keyset-пагинации в алфавитном порядке
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_courses_name ON courses (name, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_resources_name ON resources (name, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_terms_term ON terms (term)")
+            _migrate_terms_first_letter(cursor)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_groups_name ON groups (name, id)")
+
+            _init_search_index(cursor)
+
+            # Администраторы (в дополнение к переменной окружения ADMIN_IDS)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS admins (
+                user_id INTEGER PRIMARY KEY,
+                comment TEXT
+            )
+            """)
+
+            # Состояния FSM (database/fsm_storage.py)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS fsm_storage (
+                key TEXT PRIMARY KEY,
+                state TEXT,
+                data TEXT NOT NULL DEFAULT '{}',
+                updated_at REAL NOT NULL
+            )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_fsm_storage_updated_at ON fsm_storage (updated_at)")
+
+            # Запросы /search по короткому ключу из callback_data кнопок листания
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_queries (
+                key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                used_at REAL NOT NULL
+            )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_search_queries_used_at ON search_queries (used_at)")
 
-        conn.commit()
-        logger.info("Таблицы проверены/созданы.")
+            conn.commit()
+            logger.info("Таблицы проверены/созданы.")
     except sqlite3.Error as e:
         logger.error(f"Ошибка при инициализации базы данных: {e}")
-    finally:
-        if conn:
-            conn.close()
 
 # Функции для Курсов 
 
+@db_task
 def add_course(name: str, description: str, link: str) -> bool:
     try:
         with get_db_connection() as conn:
@@ -75,6 +252,7 @@ def add_course(name: str, description: str, link: str) -> bool:
                 (name, description, link)
             )
             conn.commit()
+            catalog_cache.invalidate("course")
             logger.info(f"Курс '{name}' добавлен.")
             return True
     except sqlite3.IntegrityError:
@@ -86,12 +264,14 @@ def add_course(name: str, description: str, link: str) -> bool:
 
 
 # Удаление курса по ID
+@db_task
 def delete_course(course_id: int) -> bool:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM courses WHERE id = ?", (course_id,))
             conn.commit()
+            catalog_cache.invalidate("course")
             success = cursor.rowcount > 0
             if success:
                 logger.info(f"Курс с ID {course_id} удален.")
@@ -103,6 +283,8 @@ def delete_course(course_id: int) -> bool:
         return False
 
 # Получение всех курсов 
+@cached("course")
+@db_task
 def get_all_courses() -> List[Tuple[int, str, Any, Any]]: 
     try:
         with get_db_connection() as conn:
@@ -115,6 +297,7 @@ def get_all_courses() -> List[Tuple[int, str, Any, Any]]:
         return []
 
 # Функции для Ресурсов 
+@db_task
 def add_resource(name: str, description: str, link: str) -> bool:
     try:
         with get_db_connection() as conn:
@@ -124,6 +307,7 @@ def add_resource(name: str, description: str, link: str) -> bool:
                 (name, description, link)
             )
             conn.commit()
+            catalog_cache.invalidate("resource")
             logger.info(f"Ресурс '{name}' добавлен.")
             return True
     except sqlite3.IntegrityError:
@@ -134,12 +318,14 @@ def add_resource(name: str, description: str, link: str) -> bool:
         return False
 
 # Удаление ресурса по ID
+@db_task
 def delete_resource(resource_id: int) -> bool:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM resources WHERE id = ?", (resource_id,))
             conn.commit()
+            catalog_cache.invalidate("resource")
             success = cursor.rowcount > 0
             if success:
                 logger.info(f"Ресурс с ID {resource_id} удален.")
@@ -151,6 +337,8 @@ def delete_resource(resource_id: int) -> bool:
         return False
 
 # Получение всех ресурсов
+@cached("resource")
+@db_task
 def get_all_resources() -> List[Tuple[int, str, Any, Any]]: 
     try:
         with get_db_connection() as conn:
@@ -164,15 +352,19 @@ def get_all_resources() -> List[Tuple[int, str, Any, Any]]:
 
 # --- Функции для Терминов ---
 
+@db_task
 def add_term(term: str, definition: str) -> bool:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                "INSERT INTO terms (term, definition) VALUES (?, ?)",
-                (term, definition)
+                "INSERT INTO terms (term, definition, first_letter) VALUES (?, ?, ?)",
+                (term, definition, term_first_letter(term))
             )
             conn.commit()
+            catalog_cache.invalidate("term")
+            term_index.add(term, definition)
+            trigram_index.add(term, definition)
             logger.info(f"Термин '{term}' добавлен.")
             return True
     except sqlite3.IntegrityError:
@@ -183,14 +375,18 @@ def add_term(term: str, definition: str) -> bool:
         return False
 
 # Функция удаления термина 
+@db_task
 def delete_term(term: str) -> bool:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM terms WHERE term = ?", (term,))
             conn.commit()
+            catalog_cache.invalidate("term")
             success = cursor.rowcount > 0
             if success:
+                term_index.remove(term)
+                trigram_index.remove(term)
                 logger.info(f"Термин '{term}' удален.")
             else:
                 logger.warning(f"Термин '{term}' не найден для удаления.")
@@ -199,20 +395,45 @@ def delete_term(term: str) -> bool:
         logger.error(f"Ошибка удаления термина '{term}': {e}")
         return False
 
-# Функция получения всех терминов 
-def get_all_terms() -> List[Tuple[str, str]]: 
+# Загрузка индексов терминов для inline- и нечёткого поиска (вызывается при старте бота)
+def load_term_index() -> None:
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT term, definition FROM terms")
-            terms = cursor.fetchall()
-            return terms 
+            terms = conn.execute("SELECT term, definition FROM terms").fetchall()
+        term_index.load(terms)
+        trigram_index.load(terms)
+        logger.info(f"Индекс терминов загружен: {len(term_index)} терминов.")
     except sqlite3.Error as e:
-        logger.error(f"Ошибка получения терминов: {e}")
-        return []
+        logger.error(f"Ошибка загрузки индекса терминов: {e}")
+
+# Страница терминов на заданную букву (keyset-пагинация по (term, rowid))
+@cached("term")
+@db_task
+def get_terms_by_letter(letter: str, limit: int, cursor: Optional[str] = None, offset: int = 0) -> Tuple[List[Tuple[int, str, str]], bool]:
+    try:
+        with get_db_connection() as conn:
+            return _fetch_page(
+                conn, "terms", "rowid, term, definition", ("term", "rowid"), limit, cursor, offset,
+                where="first_letter = ?", params=(term_first_letter(letter),)
+            )
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка получения терминов на букву '{letter}': {e}")
+        return [], False
+
+# Страница всех терминов в алфавитном порядке
+@cached("term")
+@db_task
+def get_terms_page(limit: int, cursor: Optional[str] = None, offset: int = 0) -> Tuple[List[Tuple[int, str, str]], bool]:
+    try:
+        with get_db_connection() as conn:
+            return _fetch_page(conn, "terms", "rowid, term, definition", ("term", "rowid"), limit, cursor, offset)
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка получения страницы терминов: {e}")
+        return [], False
 
 # Функции для Групп 
 
+@db_task
 def add_group(name: str, description: str, link: str) -> bool:
     try:
         with get_db_connection() as conn:
@@ -222,6 +443,7 @@ def add_group(name: str, description: str, link: str) -> bool:
                 (name, description, link)
             )
             conn.commit()
+            catalog_cache.invalidate("group")
             logger.info(f"Группа '{name}' добавлена.")
             return True
     except sqlite3.IntegrityError:
@@ -232,12 +454,14 @@ def add_group(name: str, description: str, link: str) -> bool:
         return False
 
 # Удаление группы по ID
+@db_task
 def delete_group(group_id: int) -> bool:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM groups WHERE id = ?", (group_id,))
             conn.commit()
+            catalog_cache.invalidate("group")
             success = cursor.rowcount > 0
             if success:
                 logger.info(f"Группа с ID {group_id} удалена.")
@@ -249,6 +473,8 @@ def delete_group(group_id: int) -> bool:
         return False
 
 # Получение всех групп 
+@cached("group")
+@db_task
 def get_all_groups() -> List[Tuple[int, str, Any, Any]]: 
     try:
         with get_db_connection() as conn:
@@ -260,72 +486,263 @@ def get_all_groups() -> List[Tuple[int, str, Any, Any]]:
         logger.error(f"Ошибка при получении всех групп: {e}")
         return []
 
-async def get_items_page(category: str, page: int, items_per_page: int) -> List[Tuple]:
-    """Получает элементы для конкретной страницы из базы данных по категории."""
-    conn = None
+# ID администраторов из таблицы admins (в дополнение к ADMIN_IDS)
+@db_task
+def get_admin_ids() -> List[int]:
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        offset = (page - 1) * items_per_page
-        query = ""
-        if category == "course":
-            query = "SELECT id, name, description, link FROM courses LIMIT ? OFFSET ?"  
-        elif category == "resource":
-            query = "SELECT id, name, description, link FROM resources LIMIT ? OFFSET ?"
-        elif category == "term":
-            query = "SELECT term, definition FROM terms LIMIT ? OFFSET ?"
-        elif category == "group":
-            query = "SELECT id, name, description, link FROM groups LIMIT ? OFFSET ?"
-        else:
-            logger.error(f"Неизвестная категория для пагинации: {category}")
-            return []
-
-        cursor.execute(query, (items_per_page, offset))
-        items = cursor.fetchall()
-        adapted_items = []
-        for item in items:
-            if category == "term":
-                adapted_items.append((item[0], item[0]))
-            else:
-                adapted_items.append((item[0], item[1]))
-        return adapted_items 
+        with get_db_connection() as conn:
+            return [row[0] for row in conn.execute("SELECT user_id FROM admins")]
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при получении списка администраторов: {e}")
+        return []
+
+# Поиск по терминам, курсам и ресурсам, результаты упорядочены по релевантности (bm25)
+@db_task
+def search_catalog(text: str, limit: int, offset: int = 0) -> Tuple[List[Tuple[str, str, str]], bool]:
+    query = build_search_query(text)
+    if not query:
+        return [], False
+    try:
+        with get_db_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT rowid % 4, title, body FROM search_index
+                WHERE search_index MATCH ?
+                ORDER BY bm25(search_index, 10.0, 1.0)
+                LIMIT ? OFFSET ?
+                """,
+                (query, limit + 1, offset)
+            ).fetchall()
+            results = [(SEARCH_KINDS[code], title, body) for code, title, body in rows[:limit]]
+            return results, len(rows) > limit
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка поиска по запросу '{text}': {e}")
+        return [], False
+
+# Запросы /search хранятся SEARCH_QUERY_TTL секунд после последнего использования
+SEARCH_QUERY_TTL = float(os.getenv("SEARCH_QUERY_TTL", str(7 * 24 * 3600)))
 
+def search_query_key(text: str) -> str:
+    """Короткий ключ запроса для callback_data (одинаковые запросы получают один ключ)."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=6).hexdigest()
 
+# Сохранение запроса под ключом; заодно удаляются давно не использованные запросы
+@db_task
+def save_search_query(text: str) -> Optional[str]:
+    key = search_query_key(text)
+    now = time.time()
+    try:
+        with get_db_connection() as conn:
+            conn.execute(
+                "INSERT INTO search_queries (key, query, used_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET query = excluded.query, used_at = excluded.used_at",
+                (key, text, now)
+            )
+            conn.execute("DELETE FROM search_queries WHERE used_at < ?", (now - SEARCH_QUERY_TTL,))
+            conn.commit()
+            return key
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка сохранения поискового запроса '{text}': {e}")
+        return None
+
+@db_task
+def get_search_query(key: str) -> Optional[str]:
+    try:
+        with get_db_connection() as conn:
+            row = conn.execute("SELECT query FROM search_queries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE search_queries SET used_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            return row[0]
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка получения поискового запроса {key}: {e}")
+        return None
+
+# Таблица для каждой категории
+CATEGORY_TABLES = {
+    "course": "courses",
+    "resource": "resources",
+    "term": "terms",
+    "group": "groups",
+}
+
+# Страница курсов или ресурсов в алфавитном порядке
+@cached(lambda category, *args, **kwargs: category)
+@db_task
+def get_catalog_page(category: str, limit: int, cursor: Optional[str] = None, offset: int = 0) -> Tuple[List[Tuple[int, str, Any, Any]], bool]:
+    table = CATEGORY_TABLES.get(category)
+    if table is None:
+        logger.error(f"Неизвестная категория для пагинации: {category}")
+        return [], False
+    try:
+        with get_db_connection() as conn:
+            return _fetch_page(conn, table, "id, name, description, link", ("name", "id"), limit, cursor, offset)
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка при получении страницы для категории {category}: {e}")
+        return [], False
+
+@cached(lambda category, *args, **kwargs: category)
+@db_task
+def get_items_page(category: str, page: int, items_per_page: int, cursor: Optional[str] = None) -> List[Tuple]:
+    """Получает элементы для конкретной страницы из базы данных по категории.
+
+    Возвращает кортежи (идентификатор, название, rowid); rowid служит курсором
+    для перехода на соседние страницы без OFFSET.
+    """
+    table = CATEGORY_TABLES.get(category)
+    if table is None:
+        logger.error(f"Неизвестная категория для пагинации: {category}")
+        return []
+    try:
+        with get_db_connection() as conn:
+            if category == "term":
+                columns, key = "term, term, rowid", ("term", "rowid")
+            else:
+                columns, key = "id, name, id", ("name", "id")
+            items, _ = _fetch_page(
+                conn, table, columns, key, items_per_page, cursor,
+                offset=(page - 1) * items_per_page
+            )
+            return items
     except sqlite3.Error as e:
         logger.error(f"Ошибка при получении страницы {page} для категории {category}: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
 
 
-async def get_total_items_count(category: str) -> int:
+@cached(lambda category: category)
+@db_task
+def get_total_items_count(category: str) -> int:
     """Получает общее количество элементов для конкретной категории."""
-    conn = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        query = ""
-        if category == "course":
-            query = "SELECT COUNT(*) FROM courses"
-        elif category == "resource":
-            query = "SELECT COUNT(*) FROM resources"
-        elif category == "term":
-            query = "SELECT COUNT(*) FROM terms"
-        elif category == "group":
-            query = "SELECT COUNT(*) FROM groups"
-        else:
-            logger.error(f"Неизвестная категория для подсчета количества: {category}")
-            return 0
-
-        cursor.execute(query)
-        count = cursor.fetchone()[0]
-        return count
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            query = ""
+            if category == "course":
+                query = "SELECT COUNT(*) FROM courses"
+            elif category == "resource":
+                query = "SELECT COUNT(*) FROM resources"
+            elif category == "term":
+                query = "SELECT COUNT(*) FROM terms"
+            elif category == "group":
+                query = "SELECT COUNT(*) FROM groups"
+            else:
+                logger.error(f"Неизвестная категория для подсчета количества: {category}")
+                return 0
+
+            cursor.execute(query)
+            count = cursor.fetchone()[0]
+            return count
     except sqlite3.Error as e:
         logger.error(f"Ошибка при подсчете количества для категории {category}: {e}")
         return 0
-    finally:
-        if conn:
-            conn.close()
+
+# Удаление нескольких записей по rowid одной транзакцией
+@db_task
+def delete_items(category: str, rowids: List[int]) -> int:
+    table = CATEGORY_TABLES[category]
+    params = [(rowid,) for rowid in rowids]
+    try:
+        with get_db_connection() as conn:
+            terms = set()
+            if category == "term":
+                for param in params:
+                    row = conn.execute("SELECT term FROM terms WHERE rowid = ?", param).fetchone()
+                    if row:
+                        terms.add(row[0])
+            deleted = conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", params).rowcount
+            # Индексы в памяти удаляют термин целиком, поэтому оставшиеся записи с тем же термином возвращаем
+            remaining = [
+                row for term in terms
+                for row in conn.execute("SELECT term, definition FROM terms WHERE term = ?", (term,))
+            ]
+        catalog_cache.invalidate(category)
+        for term in terms:
+            term_index.remove(term)
+            trigram_index.remove(term)
+        for term, definition in remaining:
+            term_index.add(term, definition)
+            trigram_index.add(term, definition)
+        logger.info(f"Из {table} удалено записей: {deleted}.")
+        return deleted
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка массового удаления из {table}: {e}")
+        return 0
+
+# Поля категорий при массовом импорте; первое поле — ключ, по которому ищутся существующие записи
+IMPORT_COLUMNS = {
+    "course": ("name", "description", "link"),
+    "resource": ("name", "description", "link"),
+    "term": ("term", "definition"),
+    "group": ("name", "description", "link"),
+}
+
+# Массовый импорт одной транзакцией: существующие записи обновляются, новые добавляются.
+# records может быть генератором: записи сразу пишутся во временную таблицу и в памяти не копятся
+@db_task
+def import_items(category: str, records: Iterable[Tuple]) -> Optional[Dict[str, int]]:
+    table = CATEGORY_TABLES[category]
+    key, *values = IMPORT_COLUMNS[category]
+    columns = (key, *values, "first_letter") if category == "term" else (key, *values)
+    total = 0
+
+    def staged() -> Iterator[Tuple]:
+        nonlocal total
+        for record in records:
+            total += 1
+            yield (*record, term_first_letter(record[0])) if category == "term" else record
+
+    update_sql = (
+        f"UPDATE {table} SET ({', '.join(values)}) = "
+        f"(SELECT {', '.join(f's.{column}' for column in values)} FROM temp.import_staging s WHERE s.{key} = {table}.{key}) "
+        f"WHERE EXISTS (SELECT 1 FROM temp.import_staging s WHERE s.{key} = {table}.{key} AND "
+        f"({' OR '.join(f'{table}.{column} IS NOT s.{column}' for column in values)}))"
+    )
+    # Порядок строк в staging — порядок последних вхождений ключей в файле
+    insert_sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"SELECT {', '.join(f's.{column}' for column in columns)} FROM temp.import_staging s "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {table} t WHERE t.{key} = s.{key}) ORDER BY s.rowid"
+    )
+
+    # Счётчики считаются по записям файла, а не по строкам таблицы: ключ (term, name)
+    # в таблице не уникален, и одна запись обновляет все строки со своим ключом
+    differs = " OR ".join(f"t.{column} IS NOT s.{column}" for column in values)
+    existing_sql = f"SELECT COUNT(*) FROM temp.import_staging s WHERE EXISTS (SELECT 1 FROM {table} t WHERE t.{key} = s.{key})"
+    changed_sql = (
+        f"SELECT COUNT(*) FROM temp.import_staging s "
+        f"WHERE EXISTS (SELECT 1 FROM {table} t WHERE t.{key} = s.{key} AND ({differs}))"
+    )
+
+    try:
+        with get_db_connection() as conn:
+            # Повторы ключа внутри файла: побеждает последняя запись (INSERT OR REPLACE по ключу)
+            conn.execute(f"CREATE TEMP TABLE import_staging ({key} PRIMARY KEY, {', '.join(columns[1:])})")
+            try:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO temp.import_staging VALUES ({', '.join('?' for _ in columns)})", staged()
+                )
+                unique = conn.execute("SELECT COUNT(*) FROM temp.import_staging").fetchone()[0]
+                existing = conn.execute(existing_sql).fetchone()[0]
+                updated = conn.execute(changed_sql).fetchone()[0]
+                conn.execute(update_sql)
+                conn.execute(insert_sql)
+            finally:
+                conn.execute("DROP TABLE IF EXISTS temp.import_staging")
+        inserted = unique - existing
+        if inserted or updated:
+            catalog_cache.invalidate(category)
+            if category == "term":
+                load_term_index()
+        logger.info(f"Импорт в {table}: добавлено {inserted}, обновлено {updated}.")
+        return {
+            "inserted": inserted,
+            "updated": updated,
+            "unchanged": existing - updated,
+            "duplicates": total - unique,
+        }
+    except sqlite3.Error as e:
+        logger.error(f"Ошибка импорта в {table}: {e}")
+        return None
 
 init_db()
\ No newline at end of file
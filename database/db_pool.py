@@ -0,0 +1,102 @@
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = os.getenv("DB_NAME", "bot.db")
+
+# Настройки пула и PRAGMA, переопределяются переменными окружения
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", os.getenv("DB_MAX_WORKERS", "4")))
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL")
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", "-16000"))  # отрицательное значение — размер в КиБ
+DB_BUSY_TIMEOUT = int(os.getenv("DB_BUSY_TIMEOUT", "5000"))  # миллисекунды
+
+
+class ConnectionPool:
+    """Пул долгоживущих соединений SQLite.
+
+    Соединения создаются лениво (не больше ``size``), настраиваются PRAGMA один раз
+    и возвращаются в пул после использования. Если все соединения заняты,
+    поток ждёт освобождения одного из них.
+    """
+
+    def __init__(self, database: str, size: int, pragmas: Optional[Dict[str, object]] = None):
+        self.database = database
+        self.size = size
+        self.pragmas = pragmas or {}
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        busy_timeout = self.pragmas.get("busy_timeout", 5000)
+        conn = sqlite3.connect(self.database, timeout=int(busy_timeout) / 1000, check_same_thread=False)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except sqlite3.Error:
+                    self._created -= 1
+                    raise
+        return self._idle.get()
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Выдаёт соединение из пула; фиксирует транзакцию или откатывает её при ошибке."""
+        conn = self._acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+
+    def close_all(self) -> None:
+        """Закрывает все свободные соединения пула."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+        logger.info("Соединения с БД закрыты.")
+
+
+db_pool = ConnectionPool(
+    DB_NAME,
+    DB_POOL_SIZE,
+    pragmas={
+        "busy_timeout": DB_BUSY_TIMEOUT,
+        "journal_mode": DB_JOURNAL_MODE,
+        "synchronous": DB_SYNCHRONOUS,
+        "mmap_size": DB_MMAP_SIZE,
+        "cache_size": DB_CACHE_SIZE,
+        "temp_store": "MEMORY",
+    },
+)
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from database.db_executor import db_task
+from database.db_manager import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+# Через сколько секунд бездействия состояние пользователя считается брошенным
+FSM_STATE_TTL = int(os.getenv("FSM_STATE_TTL", "86400"))
+# Сколько записей держать в памяти перед SQLite
+FSM_CACHE_SIZE = int(os.getenv("FSM_CACHE_SIZE", "1024"))
+# Как часто удалять просроченные состояния из базы, в секундах
+FSM_COMPACT_INTERVAL = int(os.getenv("FSM_COMPACT_INTERVAL", "3600"))
+
+# (состояние, данные, время последнего изменения)
+Record = Tuple[Optional[str], Dict[str, Any], float]
+EMPTY_RECORD: Record = (None, {}, 0.0)
+
+
+def storage_key(key: StorageKey) -> str:
+    return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:{key.destiny}"
+
+
+@db_task
+def _load_record(key: str) -> Record:
+    with get_db_connection() as conn:
+        row = conn.execute("SELECT state, data, updated_at FROM fsm_storage WHERE key = ?", (key,)).fetchone()
+    if not row:
+        return EMPTY_RECORD
+    state, data, updated_at = row
+    return state, json.loads(data), updated_at
+
+
+@db_task
+def _save_record(key: str, state: Optional[str], data: Dict[str, Any], updated_at: float) -> None:
+    with get_db_connection() as conn:
+        if state is None and not data:
+            # Пустое состояние не храним: таблица не растёт от завершённых диалогов
+            conn.execute("DELETE FROM fsm_storage WHERE key = ?", (key,))
+        else:
+            conn.execute(
+                "INSERT OR REPLACE INTO fsm_storage (key, state, data, updated_at) VALUES (?, ?, ?, ?)",
+                (key, state, json.dumps(data, ensure_ascii=False), updated_at)
+            )
+
+
+@db_task
+def _delete_expired(before: float) -> int:
+    with get_db_connection() as conn:
+        return conn.execute("DELETE FROM fsm_storage WHERE updated_at < ?", (before,)).rowcount
+
+
+class SQLiteStorage(BaseStorage):
+    """Хранилище FSM в таблице fsm_storage с LRU-кэшем в памяти.
+
+    Состояния, не менявшиеся дольше ttl секунд, считаются пустыми и
+    периодически удаляются из базы фоновой задачей (start_compaction).
+    """
+
+    def __init__(self, ttl: int = FSM_STATE_TTL, cache_size: int = FSM_CACHE_SIZE,
+                 compact_interval: int = FSM_COMPACT_INTERVAL):
+        self.ttl = ttl
+        self.cache_size = cache_size
+        self.compact_interval = compact_interval
+        self._cache: "OrderedDict[str, Record]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._compaction_task: Optional[asyncio.Task] = None
+
+    def _expired(self, record: Record) -> bool:
+        return record[2] < time.time() - self.ttl
+
+    def _remember(self, key: str, record: Record) -> None:
+        with self._lock:
+            self._cache[key] = record
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def _get_record(self, key: StorageKey) -> Record:
+        db_key = storage_key(key)
+        with self._lock:
+            record = self._cache.get(db_key)
+            if record is not None:
+                self._cache.move_to_end(db_key)
+        if record is None:
+            record = await _load_record(db_key)
+            self._remember(db_key, record)
+        return EMPTY_RECORD if self._expired(record) and record is not EMPTY_RECORD else record
+
+    async def _set_record(self, key: StorageKey, state: Optional[str], data: Dict[str, Any]) -> None:
+        db_key = storage_key(key)
+        now = time.time()
+        self._remember(db_key, (state, data, now) if state is not None or data else EMPTY_RECORD)
+        await _save_record(db_key, state, data, now)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        _, data, _ = await self._get_record(key)
+        await self._set_record(key, state.state if isinstance(state, State) else state, data)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _, _ = await self._get_record(key)
+        return state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        state, _, _ = await self._get_record(key)
+        await self._set_record(key, state, data.copy())
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data, _ = await self._get_record(key)
+        return data.copy()
+
+    async def compact(self) -> int:
+        """Удаляет просроченные состояния из базы и кэша; возвращает число удалённых строк."""
+        before = time.time() - self.ttl
+        with self._lock:
+            for db_key in [k for k, record in self._cache.items() if record is not EMPTY_RECORD and record[2] < before]:
+                del self._cache[db_key]
+        removed = await _delete_expired(before)
+        if removed:
+            logger.info(f"Удалено просроченных состояний FSM: {removed}")
+        return removed
+
+    async def _compaction_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                await self.compact()
+            except Exception as e:
+                logger.error(f"Ошибка при очистке состояний FSM: {e}")
+
+    def start_compaction(self) -> None:
+        if self._compaction_task is None:
+            self._compaction_task = asyncio.create_task(self._compaction_loop())
+
+    async def close(self) -> None:
+        if self._compaction_task is not None:
+            self._compaction_task.cancel()
+            self._compaction_task = None
+
+
+fsm_storage = SQLiteStorage()
@@ -0,0 +1,60 @@
+import threading
+from bisect import bisect_left, insort
+from typing import Iterable, List, Tuple
+
+
+class TermPrefixIndex:
+    """Индекс терминов в памяти для поиска по префиксу.
+
+    Термины хранятся в отсортированном по casefold-ключу списке, поиск —
+    двоичный (bisect) с последующим чтением подряд идущих совпадений.
+    Загружается при старте бота и обновляется функциями add_term/delete_term.
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[str, str, str]] = []  # (ключ, термин, определение)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return text.strip().casefold()
+
+    def load(self, terms: Iterable[Tuple[str, str]]) -> None:
+        entries = sorted((self._key(term), term, definition) for term, definition in terms)
+        with self._lock:
+            self._entries = entries
+
+    def add(self, term: str, definition: str) -> None:
+        with self._lock:
+            insort(self._entries, (self._key(term), term, definition))
+
+    def remove(self, term: str) -> None:
+        """Удаляет все записи с этим термином (как DELETE ... WHERE term = ?)."""
+        key = self._key(term)
+        with self._lock:
+            position = bisect_left(self._entries, (key,))
+            while position < len(self._entries) and self._entries[position][0] == key:
+                if self._entries[position][1] == term:
+                    del self._entries[position]
+                else:
+                    position += 1
+
+    def search(self, prefix: str, limit: int, offset: int = 0) -> List[Tuple[str, str]]:
+        """Термины, начинающиеся с prefix (без учёта регистра), в алфавитном порядке."""
+        key = self._key(prefix)
+        results = []
+        with self._lock:
+            position = bisect_left(self._entries, (key,)) + offset
+            while position < len(self._entries) and len(results) < limit:
+                entry_key, term, definition = self._entries[position]
+                if not entry_key.startswith(key):
+                    break
+                results.append((term, definition))
+                position += 1
+        return results
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+term_index = TermPrefixIndex()
@@ -0,0 +1,109 @@
+import heapq
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from itertools import islice
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Ограничение времени на один нечёткий поиск и минимальное сходство результата
+FUZZY_TIME_BUDGET_MS = float(os.getenv("FUZZY_TIME_BUDGET_MS", "20"))
+FUZZY_MIN_SIMILARITY = float(os.getenv("FUZZY_MIN_SIMILARITY", "0.3"))
+# Через сколько элементов проверять, не вышло ли время
+DEADLINE_CHECK_INTERVAL = 256
+
+
+def trigrams(text: str) -> Set[str]:
+    """Множество триграмм строки; пробелы по краям дают триграммы для начала и конца слова."""
+    padded = f"  {' '.join(text.casefold().split())} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Инвертированный индекс триграмм по терминам для поиска с опечатками.
+
+    Сходство — коэффициент Дайса по множествам триграмм. Списки вхождений
+    просматриваются от самых редких триграмм к частым, пока не исчерпан
+    бюджет времени; время проверяется каждые DEADLINE_CHECK_INTERVAL элементов
+    и при слиянии списков, и при оценке кандидатов, поэтому время ответа
+    ограничено и на больших словарях.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, Tuple[str, str, int]] = {}  # id -> (термин, определение, число триграмм)
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._ids_by_term: Dict[str, List[int]] = defaultdict(list)
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _add_locked(self, term: str, definition: str) -> None:
+        entry_id = self._next_id
+        self._next_id += 1
+        grams = trigrams(term)
+        self._entries[entry_id] = (term, definition, len(grams))
+        self._ids_by_term[term].append(entry_id)
+        for gram in grams:
+            self._postings[gram].add(entry_id)
+
+    def load(self, terms: Iterable[Tuple[str, str]]) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+            self._ids_by_term.clear()
+            for term, definition in terms:
+                self._add_locked(term, definition)
+
+    def add(self, term: str, definition: str) -> None:
+        with self._lock:
+            self._add_locked(term, definition)
+
+    def remove(self, term: str) -> None:
+        with self._lock:
+            for entry_id in self._ids_by_term.pop(term, []):
+                self._entries.pop(entry_id, None)
+                for gram in trigrams(term):
+                    postings = self._postings.get(gram)
+                    if postings is not None:
+                        postings.discard(entry_id)
+                        if not postings:
+                            del self._postings[gram]
+
+    def search(self, query: str, limit: int = 5, min_similarity: float = FUZZY_MIN_SIMILARITY,
+               time_budget_ms: float = FUZZY_TIME_BUDGET_MS) -> List[Tuple[str, str, float]]:
+        """Ближайшие термины: (термин, определение, сходство), по убыванию сходства."""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        deadline = time.perf_counter() + time_budget_ms / 1000
+        common: Counter = Counter()
+        scored = []
+        with self._lock:
+            postings = sorted((self._postings.get(gram, ()) for gram in query_grams), key=len)
+            out_of_time = False
+            for posting in postings:
+                entries = iter(posting)
+                while not out_of_time:
+                    chunk = list(islice(entries, DEADLINE_CHECK_INTERVAL))
+                    if not chunk:
+                        break
+                    common.update(chunk)
+                    out_of_time = time.perf_counter() > deadline
+                if out_of_time:
+                    break
+            # Первая порция кандидатов оценивается всегда, чтобы при исчерпанном
+            # бюджете вернуть лучшее из уже найденного, а не пустой ответ
+            candidates = iter(common.items())
+            while True:
+                chunk = list(islice(candidates, DEADLINE_CHECK_INTERVAL))
+                for entry_id, shared in chunk:
+                    term, definition, size = self._entries[entry_id]
+                    similarity = 2 * shared / (len(query_grams) + size)
+                    if similarity >= min_similarity:
+                        scored.append((similarity, term, definition))
+                if len(chunk) < DEADLINE_CHECK_INTERVAL or time.perf_counter() > deadline:
+                    break
+        best = heapq.nlargest(limit, scored)
+        return [(term, definition, similarity) for similarity, term, definition in best]
+
+
+trigram_index = TrigramIndex()
@@ -1,6 +1,6 @@
 # handlers/admin_handler.py
 from aiogram import Router, F, Bot 
-from aiogram.types import Message, CallbackQuery, ReplyKeyboardRemove
+from aiogram.types import Message, CallbackQuery, ReplyKeyboardRemove, FSInputFile
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
@@ -8,6 +8,7 @@ from dotenv import load_dotenv
 import os
 import logging
 import math 
+import tempfile
 from utils.pagination_admin import create_paginated_keyboard, ADMIN_DELETE_ITEMS_PER_PAGE
 from keyboards.admin_keyboard import (
     admin_main_menu,
@@ -23,6 +24,18 @@ from database.db_manager import (
     add_group,  delete_group,
     get_items_page, get_total_items_count
 )
+from database.catalog_cache import catalog_cache
+from utils.pagination import rendered_pages
+from utils.rate_limiter import outbound_limiter
+from utils.retry import retry_middleware
+from utils.edit_guard import edit_guard
+from utils.admin_access import admin_registry, setup_admin_access
+from utils.catalog_import import IMPORT_MAX_FILE_SIZE, format_import_report, import_file, import_format
+from utils.catalog_export import (
+    EXPORT_FORMATS, EXPORT_MAX_FILE_SIZE,
+    backup_database, backup_file_name, export_file_name, export_table
+)
+from database.db_executor import run_db
 
 
 logging.basicConfig(level=logging.INFO)
@@ -37,74 +50,89 @@ class AdminStates(StatesGroup):
     waiting_for_description = State()
     waiting_for_link = State()
     waiting_for_goto_page_number = State()
+    waiting_for_import_file = State()
   
-# Функция для проверки прав администратора
-async def check_admin_access(event: Message | CallbackQuery) -> bool:
-    try:
-        admin_ids_str = os.getenv("ADMIN_IDS")
-        if not admin_ids_str:
-             logger.error("Переменная окружения ADMIN_IDS не установлена.")
-             if isinstance(event, Message):
-                  await event.answer("⚠️ Ошибка конфигурации бота. ADMIN_IDS не установлен.")
-             elif isinstance(event, CallbackQuery):
-                  await event.answer("⚠️ Ошибка конфигурации бота. ADMIN_IDS не установлен.", show_alert=True)
-             return False
-
-        ADMIN_IDS = [int(id.strip()) for id in admin_ids_str.split(",")]
-        user_id = event.from_user.id
-
-        if user_id not in ADMIN_IDS:
-            if isinstance(event, Message):
-                 await event.answer("⛔ У вас нет доступа к этой команде.")
-            elif isinstance(event, CallbackQuery):
-                 await event.answer("⛔ У вас нет доступа к этой команде.", show_alert=True)
-            return False
-        return True
-    except ValueError:
-         logger.error(f"Ошибка при парсинге ADMIN_IDS: {os.getenv('ADMIN_IDS')}. Убедитесь, что это числа, разделенные запятыми.")
-         if isinstance(event, Message):
-              await event.answer("⚠️ Ошибка конфигурации бота. Неверный формат ADMIN_IDS.")
-         elif isinstance(event, CallbackQuery):
-              await event.answer("⚠️ Ошибка конфигурации бота. Неверный формат ADMIN_IDS.", show_alert=True)
-         return False
-    except Exception as e:
-        logger.error(f"Ошибка проверки прав: {e}")
-        if isinstance(event, Message):
-             await event.answer("⚠️ Произошла ошибка при проверке прав доступа.")
-        elif isinstance(event, CallbackQuery):
-             await event.answer("⚠️ Произошла ошибка при проверке прав доступа.", show_alert=True)
-        return False
+# Доступ к роутеру есть только у администраторов (utils/admin_access.py)
+setup_admin_access(router)
 
 # --- Обработчики главного меню админ-панели ---
 @router.message(Command("admin"))
 async def admin_panel(message: Message):
-    if not await check_admin_access(message): return
     await message.answer("👨‍💻 Добро пожаловать в админ-панель!", reply_markup=admin_main_menu())
 
+# Перечитать список администраторов (ADMIN_IDS и таблица admins) без перезапуска
+@router.message(Command("reload_admins"))
+async def reload_admins(message: Message):
+    admin_ids = await admin_registry.reload()
+    await message.answer(f"✅ Список администраторов обновлён: {len(admin_ids)}")
+
+# Статистика кэша каталога и кэша готовых страниц
+@router.message(Command("cache"))
+async def cache_stats(message: Message):
+    lines = []
+    for title, cache in (("🗄 Кэш каталога", catalog_cache), ("📄 Кэш страниц", rendered_pages)):
+        stats = cache.stats()
+        lines.append(
+            f"{title}:\n"
+            f"Записей: {stats['size']} из {stats['maxsize']}\n"
+            f"Попаданий: {stats['hits']}\n"
+            f"Промахов: {stats['misses']}\n"
+            f"Вытеснено: {stats['evictions']}\n"
+            f"Доля попаданий: {stats['hit_rate']:.1%}"
+        )
+    await message.answer("\n\n".join(lines))
+
+# Состояние очереди исходящих сообщений
+@router.message(Command("queue"))
+async def queue_stats(message: Message):
+    stats = outbound_limiter.stats()
+    guard = edit_guard.stats()
+    sent = "\n".join(f"  {method}: {count}" for method, count in sorted(stats["sent"].items())) or "  —"
+    await message.answer(
+        f"📤 Очередь отправки:\n"
+        f"Сейчас в очереди: {stats['queue_depth']}\n"
+        f"Максимум в очереди: {stats['max_queue_depth']}\n"
+        f"Задержано запросов: {stats['delayed']}\n"
+        f"Суммарное ожидание: {stats['total_wait']:.1f} с\n"
+        f"Отслеживается чатов: {stats['tracked_chats']}\n"
+        f"Отправлено:\n{sent}\n\n"
+        f"✏️ Правки сообщений:\n"
+        f"Отслеживается сообщений: {guard['tracked']}\n"
+        f"Пропущено без изменений: {guard['skipped']}\n"
+        f"Ответов «message is not modified»: {guard['not_modified']}"
+    )
+
+# Повторы запросов к Bot API по методам
+@router.message(Command("retries"))
+async def retry_stats(message: Message):
+    stats = retry_middleware.stats()
+    lines = ["🔁 Повторы запросов к Telegram:"]
+    for title, key in (("Повторов", "retries"), ("Из них по 429", "retry_after"), ("Бюджет исчерпан", "failures"),
+                       ("429 дольше RETRY_MAX_DELAY", "retry_after_too_long"),
+                       ("Без повтора (запрос мог дойти)", "not_retried")):
+        counts = ", ".join(f"{method}: {count}" for method, count in sorted(stats[key].items())) or "—"
+        lines.append(f"{title}: {counts}")
+    await message.answer("\n".join(lines))
+
 @router.message(F.text == "📚 Управление учебным планом")
 async def manage_courses(message: Message):
-    if not await check_admin_access(message): return
     await message.answer("📚 Управление учебным планом:", reply_markup=manage_courses_keyboard())
 
 @router.message(F.text == "🔗 Управление полезными ресурсами")
 async def manage_resources(message: Message):
-    if not await check_admin_access(message): return
     await message.answer("🔗 Управление полезными ресурсами:", reply_markup=manage_resources_keyboard())
 
 @router.message(F.text == "📖 Управление словарем IT терминов")
 async def manage_terms(message: Message):
-    if not await check_admin_access(message): return
     await message.answer("📖 Управление словарем IT терминов:", reply_markup=manage_terms_keyboard())
 
 @router.message(F.text == "👥 Управление группой ИНИТ")
 async def manage_groups(message: Message):
-    if not await check_admin_access(message): return
     await message.answer("👥 Управление группой ИНИТ:", reply_markup=manage_groups_keyboard())
 
 # --- Обработчики добавления элементов  ---
 @router.message(F.text.in_(["➕ Добавить курс", "➕ Добавить ресурс", "➕ Добавить термин", "➕ Добавить группу"]))
 async def add_entity_start(message: Message, state: FSMContext):
-    if not await check_admin_access(message): return
     await state.set_data({"action": message.text})
     await state.set_state(AdminStates.waiting_for_name)
     await message.answer("📝 Введите название:", reply_markup=ReplyKeyboardRemove()) 
@@ -129,7 +157,7 @@ async def handle_description(message: Message, state: FSMContext):
 
     if action == "➕ Добавить термин":
         try:
-            success = add_term(data["name"], data["description"]) 
+            success = await add_term(data["name"], data["description"]) 
             if success:
                 await message.answer(f"✅ Термин '{data['name']}' добавлен!", reply_markup=admin_main_menu())
             else:
@@ -164,11 +192,11 @@ async def handle_link(message: Message, state: FSMContext):
     try:
         success = False
         if action == "➕ Добавить курс":
-            success = add_course(name, description, link) 
+            success = await add_course(name, description, link) 
         elif action == "➕ Добавить ресурс":
-            success = add_resource(name, description, link) 
+            success = await add_resource(name, description, link) 
         elif action == "➕ Добавить группу":
-             success = add_group(name, description, link)
+             success = await add_group(name, description, link)
         else:
              logger.warning(f"Неизвестное действие в handle_link: {action}")
              await message.answer("⚠️ Неизвестное действие. Произошла внутренняя ошибка.")
@@ -184,10 +212,99 @@ async def handle_link(message: Message, state: FSMContext):
     finally:
         await state.clear()
 
+# --- Массовый импорт из CSV/JSON ---
+# Категория из аргумента команды: /import terms, /import курсы и т. п.
+IMPORT_CATEGORIES = {
+    "course": "course", "courses": "course", "курсы": "course",
+    "resource": "resource", "resources": "resource", "ресурсы": "resource",
+    "term": "term", "terms": "term", "термины": "term",
+    "group": "group", "groups": "group", "группы": "group",
+}
+
+@router.message(Command("import"))
+async def import_start(message: Message, state: FSMContext):
+    args = message.text.split(maxsplit=1)
+    category = IMPORT_CATEGORIES.get(args[1].strip().lower()) if len(args) > 1 else None
+    if not category:
+        await message.answer(
+            "📥 Использование: /import <courses|resources|terms|groups>\n\n"
+            "Поддерживаются файлы .csv (первая строка — заголовки), .json (массив объектов) и .jsonl.\n"
+            "Поля: name, description, link — для курсов, ресурсов и групп; term, definition — для терминов.\n"
+            "Существующие записи с тем же name/term обновляются, новые добавляются."
+        )
+        return
+    await state.set_state(AdminStates.waiting_for_import_file)
+    await state.set_data({"import_category": category})
+    await message.answer("📎 Отправьте файл .csv, .json или .jsonl для импорта.")
+
+@router.message(StateFilter(AdminStates.waiting_for_import_file), F.document)
+async def import_file_received(message: Message, state: FSMContext, bot: Bot):
+    document = message.document
+    file_format = import_format(document.file_name)
+    if not file_format:
+        await message.answer("⚠️ Поддерживаются только файлы .csv, .json и .jsonl. Отправьте другой файл:")
+        return
+    if document.file_size and document.file_size > IMPORT_MAX_FILE_SIZE:
+        await message.answer(f"⚠️ Файл слишком большой (максимум {IMPORT_MAX_FILE_SIZE // (1024 * 1024)} МБ).")
+        return
+
+    category = (await state.get_data()).get("import_category")
+    await state.clear()
+    await message.answer("⏳ Импортирую...")
+    fd, path = tempfile.mkstemp(suffix=f".{file_format}")
+    os.close(fd)
+    try:
+        await bot.download(document, destination=path)
+        report = await run_db(import_file, path, file_format, category)
+        await message.answer(format_import_report(report), reply_markup=admin_main_menu())
+    except Exception as e:
+        logger.error(f"Ошибка импорта файла {document.file_name}: {e}")
+        await message.answer("⚠️ Произошла ошибка при импорте.", reply_markup=admin_main_menu())
+    finally:
+        os.remove(path)
+
+# --- Выгрузка и резервная копия ---
+async def send_temp_document(message: Message, path: str, file_name: str, caption: str):
+    """Отправляет временный файл документом и удаляет его."""
+    try:
+        if os.path.getsize(path) > EXPORT_MAX_FILE_SIZE:
+            await message.answer("⚠️ Файл больше 50 МБ, Telegram не примет его от бота.")
+            return
+        await message.answer_document(FSInputFile(path, filename=file_name), caption=caption)
+    finally:
+        os.remove(path)
+
+@router.message(Command("export"))
+async def export_command(message: Message):
+    args = message.text.split()
+    category = IMPORT_CATEGORIES.get(args[1].lower()) if len(args) > 1 else None
+    file_format = args[2].lower() if len(args) > 2 else "csv"
+    if not category or file_format not in EXPORT_FORMATS:
+        await message.answer(
+            "📤 Использование: /export <courses|resources|terms|groups> [csv|json]\n"
+            "Файл можно изменить и загрузить обратно командой /import."
+        )
+        return
+    try:
+        path = await run_db(export_table, category, file_format)
+        await send_temp_document(message, path, export_file_name(category, file_format), "📤 Выгрузка готова")
+    except Exception as e:
+        logger.error(f"Ошибка выгрузки {category}: {e}")
+        await message.answer("⚠️ Произошла ошибка при выгрузке.")
+
+@router.message(Command("backup"))
+async def backup_command(message: Message):
+    await message.answer("⏳ Создаю резервную копию базы данных...")
+    try:
+        path = await run_db(backup_database)
+        await send_temp_document(message, path, backup_file_name(), "💾 Резервная копия базы данных")
+    except Exception as e:
+        logger.error(f"Ошибка резервного копирования: {e}")
+        await message.answer("⚠️ Произошла ошибка при создании резервной копии.")
+
 # --- Обработчики начала удаления (с пагинацией) ---
 @router.message(F.text == "➖ Удалить курс")
 async def delete_course_start(message: Message):
-    if not await check_admin_access(message): return
     category = "course"
     total_items = await get_total_items_count(category)
     current_page_items = await get_items_page(category, 1, ADMIN_DELETE_ITEMS_PER_PAGE)
@@ -208,14 +325,14 @@ async def delete_course_start(message: Message):
         pagination_callback_prefix=f"navigate_delete_{category}", 
         item_callback_prefix=f"del_{category}_by_id", 
         item_id_index=0,
-        item_name_index=1 
+        item_name_index=1,
+        item_cursor_index=2
     )
     await message.answer("🗑️ Выберите курс для удаления:", reply_markup=keyboard)
 
 
 @router.message(F.text == "➖ Удалить ресурс")
 async def delete_resource_start(message: Message):
-    if not await check_admin_access(message): return
     category = "resource"
     total_items = await get_total_items_count(category)
     current_page_items = await get_items_page(category, 1, ADMIN_DELETE_ITEMS_PER_PAGE)
@@ -235,14 +352,14 @@ async def delete_resource_start(message: Message):
         pagination_callback_prefix=f"navigate_delete_{category}",
         item_callback_prefix=f"del_{category}_by_id",
         item_id_index=0, 
-        item_name_index=1, 
+        item_name_index=1,
+        item_cursor_index=2
     )
     await message.answer("🗑️ Выберите ресурс для удаления:", reply_markup=keyboard)
 
 
 @router.message(F.text == "➖ Удалить термин")
 async def delete_term_start(message: Message):
-    if not await check_admin_access(message): return
     category = "term"
     total_items = await get_total_items_count(category)
     current_page_items = await get_items_page(category, 1, ADMIN_DELETE_ITEMS_PER_PAGE)
@@ -262,14 +379,14 @@ async def delete_term_start(message: Message):
         pagination_callback_prefix=f"navigate_delete_{category}",
         item_callback_prefix=f"del_{category}_by_name", 
         item_id_index=0,
-        item_name_index=0, 
+        item_name_index=0,
+        item_cursor_index=2
     )
     await message.answer("🗑️ Выберите термин для удаления:", reply_markup=keyboard)
 
 
 @router.message(F.text == "➖ Удалить группу")
 async def delete_group_start(message: Message):
-    if not await check_admin_access(message): return
     category = "group"
     total_items = await get_total_items_count(category)
     current_page_items = await get_items_page(category, 1, ADMIN_DELETE_ITEMS_PER_PAGE)
@@ -291,13 +408,13 @@ async def delete_group_start(message: Message):
         item_callback_prefix=f"del_{category}_by_id",
         item_id_index=0, 
         item_name_index=1,
+        item_cursor_index=2
     )
     await message.answer("🗑️ Выберите группу для удаления:", reply_markup=keyboard)
 
 
 @router.callback_query(F.data.startswith("del_course_by_id:"))
 async def handle_delete_course_by_id(callback: CallbackQuery):
-    if not await check_admin_access(callback): return
     category = "course"
     try:
         parts = callback.data.split(":")
@@ -307,7 +424,7 @@ async def handle_delete_course_by_id(callback: CallbackQuery):
              current_page = int(parts[3])
 
 
-        success = delete_course(course_id) 
+        success = await delete_course(course_id) 
         if success:
             await callback.answer(f"Курс (ID: {course_id}) успешно удален!", show_alert=True)
             total_items = await get_total_items_count(category)
@@ -337,7 +454,7 @@ async def handle_delete_course_by_id(callback: CallbackQuery):
                      total_items=total_items,
                      pagination_callback_prefix=f"navigate_delete_{category}",
                      item_callback_prefix=f"del_{category}_by_id",
-                     item_id_index=0, item_name_index=1,
+                     item_id_index=0, item_name_index=1, item_cursor_index=2,
                  )
                  await callback.message.edit_reply_markup(reply_markup=keyboard)
 
@@ -354,7 +471,6 @@ async def handle_delete_course_by_id(callback: CallbackQuery):
 
 @router.callback_query(F.data.startswith("del_resource_by_id:"))
 async def handle_delete_resource_by_id(callback: CallbackQuery):
-    if not await check_admin_access(callback): return
     category = "resource"
     try:
         parts = callback.data.split(":")
@@ -363,7 +479,7 @@ async def handle_delete_resource_by_id(callback: CallbackQuery):
         if len(parts) > 3 and parts[2] == 'page':
              current_page = int(parts[3])
 
-        success = delete_resource(resource_id) 
+        success = await delete_resource(resource_id) 
 
         if success:
             await callback.answer(f"Ресурс (ID: {resource_id}) успешно удален!", show_alert=True)
@@ -392,7 +508,7 @@ async def handle_delete_resource_by_id(callback: CallbackQuery):
                      total_items=total_items,
                      pagination_callback_prefix=f"navigate_delete_{category}",
                      item_callback_prefix=f"del_{category}_by_id",
-                     item_id_index=0, item_name_index=1,
+                     item_id_index=0, item_name_index=1, item_cursor_index=2,
                  )
                  await callback.message.edit_reply_markup(reply_markup=keyboard)
 
@@ -408,7 +524,6 @@ async def handle_delete_resource_by_id(callback: CallbackQuery):
 
 @router.callback_query(F.data.startswith("del_term_by_name:"))
 async def handle_delete_term_by_name(callback: CallbackQuery):
-    if not await check_admin_access(callback): return
     category = "term"
     try:
         parts = callback.data.split(":")
@@ -417,7 +532,7 @@ async def handle_delete_term_by_name(callback: CallbackQuery):
         if len(parts) > 3 and parts[2] == 'page':
              current_page = int(parts[3])
 
-        success = delete_term(term_name) 
+        success = await delete_term(term_name) 
 
         if success:
             await callback.answer(f"Термин '{term_name}' успешно удален!", show_alert=True)
@@ -447,7 +562,7 @@ async def handle_delete_term_by_name(callback: CallbackQuery):
                      total_items=total_items,
                      pagination_callback_prefix=f"navigate_delete_{category}",
                      item_callback_prefix=f"del_{category}_by_name",
-                     item_id_index=0, item_name_index=0,
+                     item_id_index=0, item_name_index=0, item_cursor_index=2,
                  )
                  await callback.message.edit_reply_markup(reply_markup=keyboard)
 
@@ -463,7 +578,6 @@ async def handle_delete_term_by_name(callback: CallbackQuery):
 
 @router.callback_query(F.data.startswith("del_group_by_id:"))
 async def handle_delete_group_by_id(callback: CallbackQuery):
-    if not await check_admin_access(callback): return
     category = "group"
     try:
         parts = callback.data.split(":")
@@ -472,7 +586,7 @@ async def handle_delete_group_by_id(callback: CallbackQuery):
         if len(parts) > 3 and parts[2] == 'page':
              current_page = int(parts[3])
 
-        success = delete_group(group_id) 
+        success = await delete_group(group_id) 
 
         if success:
             await callback.answer(f"Группа (ID: {group_id}) успешно удалена!", show_alert=True)
@@ -501,7 +615,7 @@ async def handle_delete_group_by_id(callback: CallbackQuery):
                      total_items=total_items,
                      pagination_callback_prefix=f"navigate_delete_{category}",
                      item_callback_prefix=f"del_{category}_by_id",
-                     item_id_index=0, item_name_index=1,
+                     item_id_index=0, item_name_index=1, item_cursor_index=2,
                  )
                  await callback.message.edit_reply_markup(reply_markup=keyboard)
 
@@ -517,7 +631,6 @@ async def handle_delete_group_by_id(callback: CallbackQuery):
 
 @router.callback_query(F.data.startswith("goto_delete_page:"))
 async def ask_for_page_number(callback: CallbackQuery, state: FSMContext, bot: Bot):
-    if not await check_admin_access(callback): return
 
     try:
         category = callback.data.split(":")[1] 
@@ -536,10 +649,6 @@ async def ask_for_page_number(callback: CallbackQuery, state: FSMContext, bot: B
 
 @router.message(StateFilter(AdminStates.waiting_for_goto_page_number))
 async def process_goto_page_number(message: Message, state: FSMContext, bot: Bot):
-    if not await check_admin_access(message):
-        await state.clear() 
-        return
-
     try:
         page_number_str = message.text.strip()
         page = int(page_number_str) 
@@ -608,7 +717,8 @@ async def process_goto_page_number(message: Message, state: FSMContext, bot: Bot
             pagination_callback_prefix=f"navigate_delete_{category}",
             item_callback_prefix=item_callback_prefix_base,
             item_id_index=item_id_index,
-            item_name_index=item_name_index
+            item_name_index=item_name_index,
+            item_cursor_index=2
         )
 
         message_text = f"🗑️ Выберите {category.capitalize()} для удаления:"
@@ -645,12 +755,10 @@ async def process_goto_page_number(message: Message, state: FSMContext, bot: Bot
 # Обработчик для кнопки "🔙 Назад" в инлайн клавиатурах
 @router.callback_query(F.data == "back_to_admin")
 async def back_from_deletion_inline(callback: CallbackQuery):
-    if not await check_admin_access(callback): return
     await callback.message.edit_text("👨‍💻 Вы вернулись в админ-панель.", reply_markup=admin_main_menu())
     await callback.answer()
 
 # Обработчик для кнопки "⬅️ Назад в админ панель" на Reply клавиатуре 
 @router.message(F.text == "⬅️ Назад в админ панель")
 async def back_to_admin_panel_message(message: Message):
-    if not await check_admin_access(message): return
     await message.answer("👨‍💻 Вы вернулись в админ-панель.", reply_markup=admin_main_menu())
\ No newline at end of file
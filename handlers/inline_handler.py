@@ -0,0 +1,39 @@
+from html import escape
+
+from aiogram import Router
+from aiogram.types import InlineQuery, InlineQueryResultArticle, InputTextMessageContent
+
+from database.term_index import term_index
+
+router = Router()
+
+INLINE_RESULTS_LIMIT = 20
+INLINE_DESCRIPTION_LENGTH = 100
+# Ответы одинаковы для всех пользователей, поэтому Telegram может кэшировать их у себя
+INLINE_CACHE_TIME = 300
+
+
+# Inline-режим: @bot <начало термина>
+@router.inline_query()
+async def inline_terms(inline_query: InlineQuery):
+    prefix = inline_query.query.strip()
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    matches = term_index.search(prefix, INLINE_RESULTS_LIMIT, offset)
+
+    # id — позиция в выдаче: термины в таблице не уникальны, а повтор id
+    # в одном ответе Telegram отклоняет целиком
+    results = [
+        InlineQueryResultArticle(
+            id=str(offset + number),
+            title=term,
+            description=definition[:INLINE_DESCRIPTION_LENGTH],
+            input_message_content=InputTextMessageContent(
+                message_text=f"<b>{escape(term)}</b>\n{escape(definition)}",
+                parse_mode="HTML"
+            )
+        )
+        for number, (term, definition) in enumerate(matches)
+    ]
+    next_offset = str(offset + INLINE_RESULTS_LIMIT) if len(matches) == INLINE_RESULTS_LIMIT else ""
+
+    await inline_query.answer(results, cache_time=INLINE_CACHE_TIME, is_personal=False, next_offset=next_offset)
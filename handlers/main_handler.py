@@ -1,11 +1,12 @@
 from aiogram import Router, F
 from aiogram.types import Message
 from aiogram.filters import Command
-import sqlite3
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.types import CallbackQuery
 from keyboards.main_keyboard import get_main_keyboard
-from utils.pagination import get_all_terms, send_paginated_data, send_grouped_blocks
+from typing import Optional
+from utils.pagination import render_all_terms, send_paginated_data, send_grouped_blocks
+from database.db_manager import get_all_groups
 
 router = Router()
 
@@ -38,6 +39,7 @@ async def cmd_help(message: Message):
         "Вот что я могу для вас сделать:\n\n"
         "✨ **/start** — начни путешествие с ботом! 🚀\n"
         "✨ **/help** — нужна помощь? Я здесь, чтобы объяснить все! 💡\n"
+        "✨ **/search** — найдите термин, курс или ресурс по словам, например /search API 🔍\n"
         "✨ **/support** — свяжитесь с администратором, если возникнут вопросы! 📩\n"
         "✨ **/about** — узнайте больше о том, как я могу помочь вам в учебе! 🤖\n\n"
         "🔍 **Не забудьте воспользоваться кнопками на клавиатуре для быстрого доступа к разделам.** 🖱️",
@@ -72,36 +74,12 @@ async def cmd_about(message: Message):
 # Показать учебный план
 @router.message(lambda msg: msg.text == "📚 Учебный план")
 async def show_study_plan(message: Message):
-    conn = sqlite3.connect("bot.db")
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, name, description, link FROM courses')
-    course_records = cursor.fetchall()
-    conn.close()
-
-    courses = [(name, description, link if link else "Ссылки нет") for _, name, description, link in course_records]
-
-    await send_paginated_data(
-        message=message,
-        items=courses,
-        formatter=lambda c: f"📚 {c[0]}\n{c[1]}\n{c[2]}",
-        callback_prefix="courses"
-    )
+    await load_courses(message)
 
 # Показать ресурсы
 @router.message(lambda msg: msg.text == "🔗 Полезные ресурсы")
 async def show_resources(message: Message):
-    conn = sqlite3.connect("bot.db")
-    cursor = conn.cursor()
-    cursor.execute('SELECT name, description, link FROM resources')
-    resources = cursor.fetchall()
-    conn.close()
-
-    await send_paginated_data(
-        message=message,
-        items=resources,
-        formatter=lambda r: f"🔗 {r[0]}\n{r[1]}\n{r[2]}",
-        callback_prefix="resources"
-    )
+    await load_resources(message)
 
 # Показать словарь терминов
 @router.message(F.text == "📖 Словарь IT терминов")
@@ -131,29 +109,20 @@ async def terms_by_letter(call: CallbackQuery):
 
 @router.callback_query(F.data == "terms_all")
 async def terms_all(call: CallbackQuery):
-    terms = get_all_terms()
+    rendered = await render_all_terms()
     
-    if not terms:
+    if not rendered:
         await call.message.answer("😕 В словаре пока нет терминов.")
         return
-    # Отправляем данные с пагинацией
-    await send_paginated_data(
-        message=call.message,
-        items=terms,
-        formatter=lambda t: f"<b>{t[0]}</b>\n{t[1]}",
-        callback_prefix="terms_all"
-    )
+    response, keyboard = rendered
+    await call.message.answer(response, parse_mode="HTML", reply_markup=keyboard)
     await call.answer()
 
 
 # Показать группы
 @router.message(lambda msg: msg.text == "👥 Группа ИНИТ")
 async def show_groups(message: Message):
-    conn = sqlite3.connect("bot.db")
-    cursor = conn.cursor()
-    cursor.execute('SELECT name, description, link FROM groups')
-    groups = cursor.fetchall()
-    conn.close()
+    groups = [(name, description, link) for _, name, description, link in await get_all_groups()]
 
     if not groups:
         await message.answer("Информация отсутствует.")
@@ -172,35 +141,8 @@ async def show_groups(message: Message):
     )
 
 
-async def load_courses(message: Message, page: int = 0):
-    conn = sqlite3.connect("bot.db")
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, name, description, link FROM courses')
-    course_records = cursor.fetchall()
-    conn.close()
-
-    courses = [(name, description, link or "Ссылки нет") for _, name, description, link in course_records]
-
-    await send_paginated_data(
-        message=message,
-        items=courses,
-        formatter=lambda c: f"📚 {c[0]}\n{c[1]}\n{c[2]}",
-        callback_prefix="courses",
-        page=page
-    )
-
-async def load_resources(message: Message, page: int = 0):
-    conn = sqlite3.connect("bot.db")
-    cursor = conn.cursor()
-    cursor.execute('SELECT name, description, link FROM resources')
-    resources = cursor.fetchall()
-    conn.close()
-
-    await send_paginated_data(
-        message=message,
-        items=resources,
-        formatter=lambda r: f"🔗 {r[0]}\n{r[1]}\n{r[2]}",
-        callback_prefix="resources",
-        page=page
-    )
+async def load_courses(message: Message, page: int = 0, cursor: Optional[str] = None, edit: bool = False):
+    await send_paginated_data(message, "course", page=page, cursor=cursor, edit=edit)
 
+async def load_resources(message: Message, page: int = 0, cursor: Optional[str] = None, edit: bool = False):
+    await send_paginated_data(message, "resource", page=page, cursor=cursor, edit=edit)
@@ -0,0 +1,87 @@
+from html import escape
+
+from aiogram import Router, F
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+
+from database.db_manager import get_search_query, save_search_query, search_catalog, search_query_key
+
+router = Router()
+
+SEARCH_RESULTS_PER_PAGE = 5
+SEARCH_BODY_LENGTH = 200
+
+KIND_ICONS = {"term": "📖", "course": "📚", "resource": "🔗"}
+
+
+# callback_data страниц: "search:<ключ запроса>:<страница>"; сам запрос хранится в БД под ключом
+def get_search_keyboard(key: str, page: int, has_next_page: bool) -> InlineKeyboardMarkup:
+    buttons = []
+    if page > 0:
+        buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"search:{key}:{page - 1}"))
+    if has_next_page:
+        buttons.append(InlineKeyboardButton(text="➡️ Вперёд", callback_data=f"search:{key}:{page + 1}"))
+    return InlineKeyboardMarkup(inline_keyboard=[buttons])
+
+
+def format_search_results(query: str, results: list, page: int) -> str:
+    response = f"🔍 Результаты по запросу «{escape(query)}» (страница {page + 1}):\n\n"
+    for kind, title, body in results:
+        body = body or ""
+        if len(body) > SEARCH_BODY_LENGTH:
+            body = body[:SEARCH_BODY_LENGTH].rstrip() + "…"
+        response += f"{KIND_ICONS[kind]} <b>{escape(title)}</b>\n{escape(body)}\n\n"
+    return response.strip()
+
+
+async def render_search_page(query: str, key: str, page: int = 0):
+    """Текст и клавиатура страницы результатов поиска; None, если ничего не найдено."""
+    results, has_next_page = await search_catalog(query, SEARCH_RESULTS_PER_PAGE, page * SEARCH_RESULTS_PER_PAGE)
+    if not results:
+        return None
+    return format_search_results(query, results, page), get_search_keyboard(key, page, has_next_page)
+
+
+# Команда /search <запрос>
+@router.message(Command("search"))
+async def cmd_search(message: Message, command: CommandObject):
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer("🔍 Введите запрос после команды, например: /search API")
+        return
+
+    rendered = await render_search_page(query, search_query_key(query))
+    if not rendered:
+        await message.answer(f"😕 По запросу «{query}» ничего не найдено")
+        return
+
+    # Запрос не помещается в callback_data: кнопки несут ключ, запрос хранится в БД.
+    # Если сохранить не удалось, первая страница всё равно показывается
+    await save_search_query(query)
+    response, keyboard = rendered
+    await message.answer(response, parse_mode="HTML", reply_markup=keyboard)
+
+
+@router.callback_query(F.data.regexp(r'^search:([0-9a-f]+):(\d+)$'))
+async def handle_search_pagination(call: CallbackQuery):
+    _, key, page = call.data.split(":")
+    page = int(page)
+    query = await get_search_query(key)
+    if not query:
+        await call.answer("⌛ Поиск устарел, повторите команду /search")
+        return
+
+    rendered = await render_search_page(query, key, page)
+    if not rendered:
+        await call.answer("😕 Больше результатов нет")
+        return
+
+    response, keyboard = rendered
+    await call.message.edit_text(response, parse_mode="HTML", reply_markup=keyboard)
+    await call.answer()
+
+
+# Кнопки сообщений, отправленных до появления ключа запроса в callback_data
+@router.callback_query(F.data.regexp(r'^search:(\d+)$'))
+async def handle_legacy_search_pagination(call: CallbackQuery):
+    await call.answer("⌛ Поиск устарел, повторите команду /search")
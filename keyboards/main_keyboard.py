@@ -5,6 +5,9 @@ from aiogram.types import BotCommand
 
 router = Router()
 
+# Слово, которое открывает полный список терминов (вводится вместо буквы)
+ALL_TERMS_KEYWORD = "все"
+
 def get_main_keyboard():
     keyboard = ReplyKeyboardMarkup(
         keyboard=[
@@ -21,6 +24,7 @@ async def set_bot_commands(bot: Bot):
     commands = [
         BotCommand(command="start", description="Главное меню"),
         BotCommand(command="help", description="ℹ️ Справка"),
+        BotCommand(command="search", description="🔍 Поиск по словарю, курсам и ресурсам"),
         BotCommand(command="support", description="📩 Связь с администратором"),
         BotCommand(command="about", description="🤖 О боте"),
     ]
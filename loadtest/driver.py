@@ -0,0 +1,281 @@
+"""Нагрузочный прогон диспетчера бота против локального фейкового Bot API.
+
+Виртуальные пользователи проходят сценарий: /start, поиск терминов по букве,
+листание найденных терминов кнопкой «Вперёд», учебный план и его листание.
+Обновления подаются в настоящие роутеры из bot.py (create_dispatcher) по копии
+базы; ответы бота уходят в loadtest/fake_api.py. Результат — JSON с пропускной
+способностью и перцентилями задержки обработки обновления по типам.
+
+По умолчанию лимиты исходящих запросов сняты (замеряется сам бот); --telegram-limits
+оставляет настройки SEND_RATE_* из окружения.
+
+Запуск:
+    python -m loadtest.driver --users 500 --concurrency 100 --pages 3 --latency-ms 30 --rate-429 0.001
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+from loadtest.fake_api import FakeBotAPI
+
+LOADTEST_TOKEN = "123:loadtest"
+# Снятые лимиты отправки: выставляются до импорта utils.rate_limiter
+UNLIMITED_SEND_RATES = {
+    "SEND_RATE_GLOBAL": "1000000",
+    "SEND_RATE_CHAT": "1000000",
+    "SEND_BURST_CHAT": "1000000",
+    "SEND_RATE_GROUP": "1000000",
+    "SEND_BURST_GROUP": "1000000",
+}
+FALLBACK_LETTERS = "АБВГДИКМПСТABCDEFGHIKLMNOPRST"
+
+
+def prepare_database(snapshot: str, workdir: str) -> str:
+    """Копирует снимок базы во workdir (онлайн-бэкапом SQLite) и направляет на копию DB_NAME.
+
+    Вызывать до импорта модулей database.*: путь к базе читается при импорте.
+    """
+    path = os.path.join(workdir, os.path.basename(snapshot) or "bot.db")
+    if os.path.exists(snapshot):
+        source = sqlite3.connect(snapshot)
+        destination = sqlite3.connect(path)
+        try:
+            source.backup(destination)
+        finally:
+            destination.close()
+            source.close()
+    os.environ["DB_NAME"] = path
+    return path
+
+
+def relax_send_limits() -> None:
+    for name, value in UNLIMITED_SEND_RATES.items():
+        os.environ[name] = value
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+
+    def percentile(q: float) -> float:
+        return round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 3)
+
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "p50_ms": percentile(0.5),
+        "p90_ms": percentile(0.9),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(values[-1] * 1000, 3),
+    }
+
+
+class LoadEnvironment:
+    """Фейковый Bot API, бот с рабочей цепочкой middleware и диспетчер из bot.py на копии базы."""
+
+    def __init__(self, api: FakeBotAPI):
+        self.api = api
+        self.bot = None
+        self.dp = None
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self._update_id = 0
+
+    async def __aenter__(self) -> "LoadEnvironment":
+        from bot import create_bot, create_dispatcher
+        from database.db_executor import run_db
+        from database.db_manager import init_db, load_term_index
+        from utils.admin_access import admin_registry
+
+        url = await self.api.start()
+        self.bot = create_bot(LOADTEST_TOKEN, url)
+        self.dp = create_dispatcher()
+        await run_db(init_db)
+        await run_db(load_term_index)
+        await admin_registry.reload()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        from database.db_executor import shutdown_db_executor
+        from database.db_pool import db_pool
+        from database.fsm_storage import fsm_storage
+
+        await self.bot.session.close()
+        await fsm_storage.close()
+        await self.api.stop()
+        shutdown_db_executor()
+        db_pool.close_all()
+
+    def next_update_id(self) -> int:
+        self._update_id += 1
+        return self._update_id
+
+    async def feed(self, kind: str, update: Dict[str, Any]) -> None:
+        """Подаёт обновление в диспетчер и записывает время его обработки."""
+        from aiogram.types import Update
+
+        started = time.perf_counter()
+        try:
+            await self.dp.feed_update(self.bot, Update.model_validate(update, context={"bot": self.bot}))
+        except Exception as e:
+            self.errors[f"{kind}: {type(e).__name__}"] += 1
+        finally:
+            self.latencies[kind].append(time.perf_counter() - started)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        from utils.rate_limiter import outbound_limiter
+        from utils.retry import retry_middleware
+
+        total = sum(len(values) for values in self.latencies.values())
+        return {
+            "updates": total,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_ups": round(total / elapsed, 1) if elapsed else None,
+            "latency": {
+                "all": summarize([value for values in self.latencies.values() for value in values]),
+                **{kind: summarize(values) for kind, values in sorted(self.latencies.items())},
+            },
+            "errors": dict(self.errors),
+            "api": self.api.stats(),
+            "outbound": {key: value for key, value in outbound_limiter.stats().items() if key != "sent"},
+            "retries": retry_middleware.stats(),
+        }
+
+
+def _user(user_id: int) -> Dict[str, Any]:
+    return {"id": user_id, "is_bot": False, "first_name": f"User {user_id}", "language_code": "ru"}
+
+
+class VirtualUser:
+    def __init__(self, env: LoadEnvironment, user_id: int, letters: str, pages: int, think: float):
+        self.env = env
+        self.user_id = user_id
+        self.letters = letters
+        self.pages = pages
+        self.think = think
+
+    async def send_text(self, kind: str, text: str) -> None:
+        update_id = self.env.next_update_id()
+        await self.env.feed(kind, {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": int(time.time()),
+                "chat": {"id": self.user_id, "type": "private"},
+                "from": _user(self.user_id),
+                "text": text,
+            },
+        })
+        await self._pause()
+
+    async def press_next(self, kind: str) -> bool:
+        """Нажимает «Вперёд» под последним сообщением бота; False, если кнопки нет."""
+        message = self.env.api.last_message(self.user_id)
+        buttons = (message or {}).get("reply_markup", {}).get("inline_keyboard", [])
+        data = next((button.get("callback_data") for row in buttons for button in row
+                     if button.get("text", "").startswith("➡️")), None)
+        if not data:
+            return False
+        update_id = self.env.next_update_id()
+        await self.env.feed(kind, {
+            "update_id": update_id,
+            "callback_query": {
+                "id": str(update_id),
+                "from": _user(self.user_id),
+                "chat_instance": str(self.user_id),
+                "message": message,
+                "data": data,
+            },
+        })
+        await self._pause()
+        return True
+
+    async def _pause(self) -> None:
+        if self.think:
+            await asyncio.sleep(random.uniform(0, self.think * 2))
+
+    async def run(self) -> None:
+        await self.send_text("start", "/start")
+        await self.send_text("letter", random.choice(self.letters))
+        for _ in range(self.pages):
+            if not await self.press_next("letter_next"):
+                break
+        await self.send_text("courses", "📚 Учебный план")
+        for _ in range(self.pages):
+            if not await self.press_next("courses_next"):
+                break
+
+
+def _term_letters() -> str:
+    from database import db_manager as db
+
+    with db.get_db_connection() as conn:
+        rows = conn.execute("SELECT DISTINCT first_letter FROM terms WHERE first_letter <> ''").fetchall()
+    letters = "".join(row[0].upper() for row in rows if row[0] and row[0].isalpha())
+    return letters or FALLBACK_LETTERS
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    api = FakeBotAPI(args.latency_ms, args.jitter_ms, args.rate_429, args.retry_after, seed=args.seed)
+    async with LoadEnvironment(api) as env:
+        letters = _term_letters()
+        slots = asyncio.Semaphore(args.concurrency)
+
+        async def session(user_id: int) -> None:
+            async with slots:
+                for _ in range(args.rounds):
+                    await VirtualUser(env, user_id, letters, args.pages, args.think).run()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(session(args.first_user_id + number) for number in range(args.users)))
+        report = env.report(time.perf_counter() - started)
+        if args.record:
+            api.save_records(args.record)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200, help="число виртуальных пользователей")
+    parser.add_argument("--concurrency", type=int, default=50, help="сколько пользователей активны одновременно")
+    parser.add_argument("--rounds", type=int, default=1, help="сколько раз каждый пользователь проходит сценарий")
+    parser.add_argument("--pages", type=int, default=3, help="сколько раз листать «Вперёд»")
+    parser.add_argument("--think", type=float, default=0.0, help="средняя пауза пользователя между действиями, с")
+    parser.add_argument("--first-user-id", type=int, default=1_000_000)
+    parser.add_argument("--db", default="bot.db", help="снимок базы (используется его копия)")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--telegram-limits", action="store_true", help="не снимать лимиты отправки SEND_RATE_*")
+    parser.add_argument("--record", help="записать журнал запросов к фейковому API в JSONL")
+    parser.add_argument("--output", help="файл для JSON (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    if not args.telegram_limits:
+        relax_send_limits()
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare_database(args.db, workdir)
+        report = asyncio.run(run(args))
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Локальная замена api.telegram.org для нагрузочного тестирования.
+
+Отвечает на методы Bot API правдоподобными объектами, добавляет задержку,
+с заданной вероятностью возвращает 429 (retry_after) и записывает все запросы.
+
+Отдельный запуск (бот подключается через TELEGRAM_API_URL=http://127.0.0.1:8081):
+    python -m loadtest.fake_api --port 8081 --latency-ms 50 --jitter-ms 20 --rate-429 0.01 --record requests.jsonl
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+BOT_USER = {"id": 123, "is_bot": True, "first_name": "Load Test Bot", "username": "load_test_bot"}
+# Методы, которые возвращают отправленное или изменённое сообщение
+MESSAGE_METHODS = {"sendmessage", "editmessagetext", "editmessagereplymarkup", "senddocument"}
+
+
+class FakeBotAPI:
+    """aiohttp-приложение с ответами Bot API; хранит журнал запросов и последнее сообщение каждого чата."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, rate_429: float = 0.0,
+                 retry_after: int = 1, seed: Optional[int] = None):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.records: List[Dict[str, Any]] = []
+        self.messages: Dict[int, Dict[str, Any]] = {}  # chat_id -> последнее сообщение бота
+        self._message_ids = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.app = web.Application()
+        self.app.router.add_post("/bot{token}/{method}", self.handle)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.rate_429 and self.random.random() < self.rate_429:
+            status, body = 429, {
+                "ok": False, "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }
+        else:
+            status, body = 200, {"ok": True, "result": await self._result(method.lower(), params)}
+
+        self.records.append({
+            "time": time.time(),
+            "method": method,
+            "chat_id": params.get("chat_id"),
+            "status": status,
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+        })
+        return web.json_response(body, status=status)
+
+    async def _result(self, method: str, params: Dict[str, str]) -> Any:
+        if method == "getme":
+            return BOT_USER
+        if method == "getupdates":
+            # Обновлений нет: держим long polling, как настоящий сервер
+            await asyncio.sleep(min(float(params.get("timeout") or 0), 1.0))
+            return []
+        if method in MESSAGE_METHODS:
+            return self._message(method, params)
+        return True
+
+    def _message(self, method: str, params: Dict[str, str]) -> Dict[str, Any]:
+        chat_id = int(params.get("chat_id") or 0)
+        previous = self.messages.get(chat_id, {})
+        if method.startswith("edit"):
+            message_id = int(params.get("message_id") or 0)
+        else:
+            self._message_ids += 1
+            message_id = self._message_ids
+        message = {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "supergroup"},
+            "from": BOT_USER,
+            "text": params.get("text", previous.get("text", "")) if method != "senddocument" else None,
+        }
+        markup = json.loads(params["reply_markup"]) if params.get("reply_markup") else None
+        # В ответе бывает только inline-клавиатура; обычная клавиатура остаётся у клиента
+        if markup and "inline_keyboard" in markup:
+            message["reply_markup"] = markup
+        elif method == "editmessagetext" and "reply_markup" in previous:
+            message["reply_markup"] = previous["reply_markup"]
+        self.messages[chat_id] = message
+        return message
+
+    def last_message(self, chat_id: int) -> Optional[Dict[str, Any]]:
+        return self.messages.get(chat_id)
+
+    def stats(self) -> Dict[str, Any]:
+        statuses = Counter(record["status"] for record in self.records)
+        return {
+            "requests": len(self.records),
+            "by_method": dict(Counter(record["method"] for record in self.records)),
+            "injected_429": statuses.get(429, 0),
+        }
+
+    def save_records(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Запускает сервер и возвращает базовый адрес для TelegramAPIServer.from_base."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="задержка каждого ответа")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="случайная добавка к задержке")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="доля ответов 429 (0..1)")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after в ответах 429, секунды")
+    parser.add_argument("--record", help="файл JSONL, куда при остановке записывается журнал запросов")
+    args = parser.parse_args()
+
+    api = FakeBotAPI(args.latency_ms, args.jitter_ms, args.rate_429, args.retry_after)
+
+    async def save_on_shutdown(app: web.Application) -> None:
+        if args.record:
+            api.save_records(args.record)
+        print(json.dumps(api.stats(), ensure_ascii=False))
+
+    api.app.on_shutdown.append(save_on_shutdown)
+    web.run_app(api.app, host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
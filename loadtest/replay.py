@@ -0,0 +1,107 @@
+"""Воспроизведение записанных обновлений (UPDATE_CAPTURE_PATH) в диспетчере бота.
+
+Обновления из одного или нескольких файлов записи (включая ротированные
+capture.jsonl.1, .2, ...) сортируются по времени получения и подаются в роутеры
+из bot.py с исходными интервалами, делёнными на --speed (--speed 0 — без пауз).
+Бот работает на копии снимка базы (--db) и отвечает в loadtest/fake_api.py.
+Результат — JSON того же вида, что у loadtest.driver, плюс отставание от расписания.
+
+Запуск:
+    python -m loadtest.replay capture.jsonl* --db snapshot.db --speed 10 --latency-ms 30 --output replay.json
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+from loadtest.driver import LoadEnvironment, prepare_database, relax_send_limits, summarize
+from loadtest.fake_api import FakeBotAPI
+
+
+def load_capture(paths: List[str]) -> List[Tuple[float, Dict[str, Any]]]:
+    """Записи (время получения, обновление) из файлов записи, по возрастанию времени."""
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    records.append((entry["ts"], entry["update"]))
+    records.sort(key=lambda record: (record[0], record[1].get("update_id", 0)))
+    return records
+
+
+def event_type(update: Dict[str, Any]) -> str:
+    return next((key for key in update if key != "update_id"), "unknown")
+
+
+async def replay(records: List[Tuple[float, Dict[str, Any]]], args: argparse.Namespace) -> Dict[str, Any]:
+    api = FakeBotAPI(args.latency_ms, args.jitter_ms, args.rate_429, args.retry_after)
+    async with LoadEnvironment(api) as env:
+        slots = asyncio.Semaphore(args.max_in_flight)
+        lags = []
+
+        async def feed(update: Dict[str, Any]) -> None:
+            try:
+                await env.feed(event_type(update), update)
+            finally:
+                slots.release()
+
+        tasks = []
+        first_ts = records[0][0]
+        started = time.perf_counter()
+        for ts, update in records:
+            if args.speed > 0:
+                delay = (ts - first_ts) / args.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await slots.acquire()
+            if args.speed > 0:
+                lags.append(max(0.0, time.perf_counter() - started - (ts - first_ts) / args.speed))
+            tasks.append(asyncio.create_task(feed(update)))
+        await asyncio.gather(*tasks)
+
+        report = env.report(time.perf_counter() - started)
+    report["capture"] = {"updates": len(records), "span_s": round(records[-1][0] - first_ts, 3), "speed": args.speed}
+    if lags:
+        report["schedule_lag"] = summarize(lags)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", nargs="+", help="файлы записи обновлений (JSONL)")
+    parser.add_argument("--db", default="bot.db", help="снимок базы (используется его копия)")
+    parser.add_argument("--speed", type=float, default=1.0, help="ускорение относительно записи; 0 — без пауз")
+    parser.add_argument("--max-in-flight", type=int, default=1000, help="максимум одновременно обрабатываемых обновлений")
+    parser.add_argument("--limit", type=int, help="воспроизвести только первые N обновлений")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--telegram-limits", action="store_true", help="не снимать лимиты отправки SEND_RATE_*")
+    parser.add_argument("--output", help="файл для JSON (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    records = load_capture(args.capture)[:args.limit]
+    if not records:
+        parser.error("в файлах записи нет обновлений")
+
+    if not args.telegram_limits:
+        relax_send_limits()
+    with tempfile.TemporaryDirectory() as workdir:
+        prepare_database(args.db, workdir)
+        report = asyncio.run(replay(records, args))
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from aiogram.types import Update
+
+from utils.update_capture import anonymize, pseudonym
+
+SALT = b"test-salt"
+
+
+def _message(**fields):
+    return {
+        "update_id": 1,
+        "message": {
+            "message_id": 10,
+            "date": 1700000000,
+            "chat": {"id": -1001234567890, "type": "supergroup", "title": "ИНИТ-22"},
+            "from": {"id": 42, "is_bot": False, "first_name": "Ivan", "username": "ivan"},
+            **fields,
+        },
+    }
+
+
+def test_service_message_members_are_pseudonymized():
+    update = _message(
+        new_chat_members=[
+            {"id": 5, "is_bot": False, "first_name": "Ivan", "last_name": "Petrov", "username": "ivan"},
+            {"id": 7, "is_bot": False, "first_name": "Anna"},
+        ],
+        left_chat_member={"id": 6, "is_bot": False, "first_name": "Petr", "username": "petr"},
+    )
+    message = anonymize(update, SALT)["message"]
+
+    assert message["new_chat_members"] == [
+        {"id": pseudonym(5, SALT), "is_bot": False, "first_name": "User"},
+        {"id": pseudonym(7, SALT), "is_bot": False, "first_name": "User"},
+    ]
+    assert message["left_chat_member"] == {"id": pseudonym(6, SALT), "is_bot": False, "first_name": "User"}
+    assert message["chat"] == {"id": pseudonym(-1001234567890, SALT), "type": "supergroup"}
+    for leaked in ("Ivan", "Petrov", "ivan", "Petr", "petr", "Anna", "ИНИТ-22"):
+        assert leaked not in repr(message)
+    Update.model_validate(anonymize(update, SALT))
+
+
+def test_user_id_fields_are_pseudonymized():
+    update = _message(
+        migrate_to_chat_id=-1009876543210,
+        users_shared={"request_id": 1, "user_ids": [5, 6]},
+        chat_shared={"request_id": 2, "chat_id": -100555},
+    )
+    message = anonymize(update, SALT)["message"]
+
+    assert message["migrate_to_chat_id"] == pseudonym(-1009876543210, SALT)
+    assert message["users_shared"]["user_ids"] == [pseudonym(5, SALT), pseudonym(6, SALT)]
+    assert message["chat_shared"]["chat_id"] == pseudonym(-100555, SALT)
+
+
+def test_routing_texts_are_kept_and_free_text_is_masked():
+    texts = {
+        "/start": "/start",
+        "все": "все",
+        " Все ": " Все ",
+        "А": "А",
+        "12": "12",
+        "📚 Учебный план": "📚 Учебный план",
+        "/search Иван 123": "/search Хххх 000",
+        "Меня зовут Иван": "Хххх ххххх Хххх",
+    }
+    for text, expected in texts.items():
+        assert anonymize(_message(text=text), SALT)["message"]["text"] == expected
@@ -0,0 +1,84 @@
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+from database import db_manager as db
+
+logger = logging.getLogger(__name__)
+
+# Команды админки: на них не-администратор получает явный отказ, остальное молча пропускается дальше
+ADMIN_COMMANDS = {"/admin", "/cache", "/queue", "/retries", "/reload_admins", "/import", "/export", "/backup"}
+
+
+def parse_admin_ids(value: Optional[str]) -> FrozenSet[int]:
+    """ID администраторов из строки вида "123, 456"; неверные значения пропускаются."""
+    admin_ids = set()
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            admin_ids.add(int(part))
+        except ValueError:
+            logger.error(f"Неверный ID администратора в ADMIN_IDS: {part!r}")
+    return frozenset(admin_ids)
+
+
+class AdminRegistry:
+    """Множество ID администраторов: ADMIN_IDS из окружения плюс таблица admins.
+
+    Загружается один раз при старте (reload) и перечитывается командой /reload_admins;
+    проверка доступа — поиск во frozenset без обращения к окружению и БД.
+    """
+
+    def __init__(self):
+        self.ids: FrozenSet[int] = frozenset()
+
+    def is_admin(self, user_id: int) -> bool:
+        return user_id in self.ids
+
+    async def reload(self) -> FrozenSet[int]:
+        env_ids = parse_admin_ids(os.getenv("ADMIN_IDS"))
+        self.ids = env_ids | frozenset(await db.get_admin_ids())
+        if not self.ids:
+            logger.error("Список администраторов пуст: задайте ADMIN_IDS или добавьте записи в таблицу admins.")
+        return self.ids
+
+
+admin_registry = AdminRegistry()
+
+
+class AdminAccessMiddleware(BaseMiddleware):
+    """Outer-middleware роутера админки: события не-администраторов не доходят
+    до фильтров роутера и уходят следующим роутерам как необработанные."""
+
+    def __init__(self, registry: AdminRegistry = admin_registry):
+        self.registry = registry
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = getattr(event, "from_user", None)
+        if user is not None and self.registry.is_admin(user.id):
+            return await handler(event, data)
+
+        if isinstance(event, Message) and event.text:
+            command = event.text.split()[0].split("@")[0]
+            if command in ADMIN_COMMANDS:
+                await event.answer("⛔ У вас нет доступа к этой команде.")
+                return None
+        return UNHANDLED
+
+
+def setup_admin_access(router, registry: AdminRegistry = admin_registry) -> None:
+    """Подключает проверку прав ко всем сообщениям и callback-запросам роутера."""
+    middleware = AdminAccessMiddleware(registry)
+    router.message.outer_middleware(middleware)
+    router.callback_query.outer_middleware(middleware)
@@ -0,0 +1,83 @@
+import csv
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime
+
+from database import db_manager as db
+
+EXPORT_FORMATS = ("csv", "json")
+# Telegram принимает от ботов документы не больше 50 МБ
+EXPORT_MAX_FILE_SIZE = 50 * 1024 * 1024
+# Сколько страниц копировать за один шаг онлайн-бэкапа (между шагами запись в БД не блокируется)
+BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "1024"))
+
+
+def _timestamp() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def export_table(category: str, file_format: str) -> str:
+    """Выгружает таблицу категории во временный файл построчно и возвращает путь к нему.
+
+    Поля те же, что принимает /import, так что файл можно загрузить обратно.
+    Выполняется в пуле потоков БД.
+    """
+    table = db.CATEGORY_TABLES[category]
+    columns = db.IMPORT_COLUMNS[category]
+    fd, path = tempfile.mkstemp(prefix=f"{table}_", suffix=f".{file_format}")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as stream, db.get_db_connection() as conn:
+            rows = conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY {columns[0]}, rowid")
+            if file_format == "csv":
+                writer = csv.writer(stream)
+                writer.writerow(columns)
+                writer.writerows(rows)
+            else:
+                stream.write("[")
+                for number, row in enumerate(rows):
+                    stream.write(",\n" if number else "\n")
+                    stream.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+                stream.write("\n]\n")
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def backup_database() -> str:
+    """Копия базы через онлайн-бэкап SQLite, сжатая gzip; возвращает путь к файлу.
+
+    Бэкап идёт по BACKUP_PAGES_PER_STEP страниц, поэтому бот продолжает
+    писать в базу во время копирования. Выполняется в пуле потоков БД.
+    """
+    fd, raw_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    path = f"{raw_path}.gz"
+    try:
+        destination = sqlite3.connect(raw_path)
+        try:
+            with db.get_db_connection() as conn:
+                conn.backup(destination, pages=BACKUP_PAGES_PER_STEP)
+        finally:
+            destination.close()
+        with open(raw_path, "rb") as source, gzip.open(path, "wb") as target:
+            shutil.copyfileobj(source, target)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    finally:
+        os.remove(raw_path)
+    return path
+
+
+def export_file_name(category: str, file_format: str) -> str:
+    return f"{db.CATEGORY_TABLES[category]}_{_timestamp()}.{file_format}"
+
+
+def backup_file_name() -> str:
+    return f"{os.path.splitext(os.path.basename(db.DB_NAME))[0]}_{_timestamp()}.db.gz"
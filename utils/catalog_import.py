@@ -0,0 +1,136 @@
+import csv
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from database import db_manager as db
+
+# Расширение файла -> формат
+IMPORT_FORMATS = {".csv": "csv", ".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+# Telegram отдаёт ботам файлы не больше 20 МБ
+IMPORT_MAX_FILE_SIZE = int(os.getenv("IMPORT_MAX_FILE_SIZE", str(20 * 1024 * 1024)))
+# Сколько ошибок в строках показывать в отчёте
+IMPORT_MAX_REPORTED_ERRORS = 10
+
+_JSON_CHUNK_SIZE = 64 * 1024
+
+
+def import_format(file_name: Optional[str]) -> Optional[str]:
+    return IMPORT_FORMATS.get(os.path.splitext(file_name or "")[1].lower())
+
+
+def _iter_csv(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _iter_jsonl(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    for line_number, line in enumerate(stream, start=1):
+        if line.strip():
+            yield line_number, json.loads(line)
+
+
+def _iter_json_array(stream: TextIO) -> Iterator[Tuple[int, Any]]:
+    """Элементы JSON-массива по одному, не загружая весь файл в память."""
+    decoder = json.JSONDecoder()
+    buffer, eof, started, index = "", False, False, 0
+    while True:
+        buffer = buffer.lstrip()
+        if buffer and not started:
+            if buffer[0] != "[":
+                raise ValueError("ожидался JSON-массив объектов")
+            buffer, started = buffer[1:], True
+            continue
+        if buffer[:1] == "]":
+            return
+        if buffer[:1] == "," and index:
+            buffer = buffer[1:]
+            continue
+        if buffer:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                index += 1
+                buffer = buffer[end:]
+                yield index, item
+                continue
+        if eof:
+            raise ValueError("файл закончился раньше, чем JSON-массив")
+        chunk = stream.read(_JSON_CHUNK_SIZE)
+        eof = not chunk
+        buffer += chunk
+
+
+_READERS = {"csv": _iter_csv, "json": _iter_json_array, "jsonl": _iter_jsonl}
+
+
+def _to_record(category: str, item: Any) -> Tuple:
+    """Кортеж полей категории из строки файла; ValueError, если строка неполная."""
+    if not isinstance(item, dict):
+        raise ValueError("ожидался объект с полями")
+    item = {str(key).strip().lower(): value for key, value in item.items() if key is not None}
+    key, *values = db.IMPORT_COLUMNS[category]
+    record = tuple("" if item.get(column) is None else str(item[column]).strip() for column in (key, *values))
+    missing = [column for column, value in zip((key, *values), record) if not value and column != "link"]
+    if missing:
+        raise ValueError(f"не заполнено: {', '.join(missing)}")
+    if "link" in values:
+        link = record[-1]
+        if link and not link.startswith(("http://", "https://")):
+            raise ValueError("ссылка должна начинаться с http:// или https://")
+    return record
+
+
+def import_file(path: str, file_format: str, category: str) -> Dict[str, Any]:
+    """Читает файл потоково и загружает записи одной транзакцией (выполняется в пуле потоков БД).
+    Записи передаются в базу генератором, поэтому память не растёт с размером файла."""
+    errors: List[str] = []
+    counts = {"records": 0, "errors": 0}
+
+    def records() -> Iterator[Tuple]:
+        for position, item in _READERS[file_format](stream):
+            try:
+                record = _to_record(category, item)
+            except ValueError as e:
+                counts["errors"] += 1
+                if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+                    errors.append(f"{position}: {e}")
+                continue
+            counts["records"] += 1
+            yield record
+
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as stream:
+            # Ошибка чтения посреди файла прерывает импорт, транзакция откатывается
+            result = db.import_items.sync(category, records())
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return {"ok": False, "error": f"Не удалось прочитать файл: {e}"}
+
+    if result is None:
+        return {"ok": False, "error": "Ошибка базы данных, изменения отменены."}
+    return {"ok": True, "read": counts["records"] + counts["errors"], "skipped": counts["errors"],
+            "errors": errors, **result}
+
+
+def format_import_report(report: Dict[str, Any]) -> str:
+    if not report["ok"]:
+        return f"❌ {report['error']}"
+    lines = [
+        "✅ Импорт завершён:",
+        f"Прочитано строк: {report['read']}",
+        f"Добавлено: {report['inserted']}",
+        f"Обновлено: {report['updated']}",
+        f"Без изменений: {report['unchanged']}",
+        f"Повторы в файле: {report['duplicates']}",
+        f"Пропущено с ошибками: {report['skipped']}",
+    ]
+    if report["errors"]:
+        lines.append("\nОшибки (строка: причина):")
+        lines.extend(report["errors"])
+        if report["skipped"] > len(report["errors"]):
+            lines.append(f"… и ещё {report['skipped'] - len(report['errors'])}")
+    return "\n".join(lines)
@@ -0,0 +1,107 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import EditMessageReplyMarkup, EditMessageText, SendMessage, TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from aiogram.types import InlineKeyboardMarkup
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних сообщений бота помнить
+EDIT_GUARD_SIZE = int(os.getenv("EDIT_GUARD_SIZE", "4096"))
+
+
+def fingerprint(*parts: Any) -> str:
+    """Короткий хэш содержимого: текст, режим разметки, клавиатура."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, InlineKeyboardMarkup):
+            part = part.model_dump_json(exclude_none=True)
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class EditGuard(BaseRequestMiddleware):
+    """Middleware сессии бота: помнит отпечатки текста и клавиатуры сообщений,
+    которые бот отправил или отредактировал, и не отправляет в Telegram правку,
+    которая ничего не меняет (Telegram ответил бы "message is not modified")."""
+
+    def __init__(self, maxsize: int = EDIT_GUARD_SIZE):
+        self.maxsize = maxsize
+        # (chat_id, message_id) -> (отпечаток текста, отпечаток клавиатуры)
+        self._messages: "OrderedDict[Tuple[Any, int], Tuple[Optional[str], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.skipped = 0
+        self.not_modified = 0
+
+    def _get(self, key) -> Optional[Tuple[Optional[str], str]]:
+        with self._lock:
+            state = self._messages.get(key)
+            if state is not None:
+                self._messages.move_to_end(key)
+            return state
+
+    def _set(self, key, text_fp: Optional[str], markup_fp: str) -> None:
+        with self._lock:
+            self._messages[key] = (text_fp, markup_fp)
+            self._messages.move_to_end(key)
+            while len(self._messages) > self.maxsize:
+                self._messages.popitem(last=False)
+
+    @staticmethod
+    def _content(method: TelegramMethod) -> Tuple[Optional[str], str]:
+        markup = method.reply_markup if isinstance(method.reply_markup, InlineKeyboardMarkup) else None
+        if isinstance(method, EditMessageReplyMarkup):
+            return None, fingerprint(markup)
+        return fingerprint(method.text, method.parse_mode, method.entities), fingerprint(markup)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        if not isinstance(method, (SendMessage, EditMessageText, EditMessageReplyMarkup)):
+            return await make_request(bot, method)
+
+        text_fp, markup_fp = self._content(method)
+        if isinstance(method, SendMessage):
+            result = await make_request(bot, method)
+            self._set((result.chat.id, result.message_id), text_fp, markup_fp)
+            return result
+
+        # Сообщения inline-режима не отслеживаем
+        if method.message_id is None:
+            return await make_request(bot, method)
+
+        key = (method.chat_id, method.message_id)
+        previous = self._get(key)
+        if text_fp is None and previous is not None:
+            text_fp = previous[0]  # правка одной клавиатуры текст не меняет
+        if previous == (text_fp, markup_fp):
+            self.skipped += 1
+            return True
+
+        try:
+            result = await make_request(bot, method)
+        except TelegramBadRequest as e:
+            if "message is not modified" not in e.message:
+                raise
+            self.not_modified += 1
+            result = True
+        self._set(key, text_fp, markup_fp)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {"tracked": len(self._messages), "skipped": self.skipped, "not_modified": self.not_modified}
+
+
+edit_guard = EditGuard()
@@ -1,84 +1,148 @@
-from aiogram import types, F, Router
+from aiogram import types, F, Router, Bot
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 from aiogram.filters import StateFilter
 from aiogram.fsm.state import State, StatesGroup
-import sqlite3
+import os
+from html import escape
+from typing import List, Optional, Tuple
+from database import db_manager as db
+from database.catalog_cache import CatalogCache, catalog_cache, cached
+from database.trigram_index import trigram_index
+from keyboards.main_keyboard import ALL_TERMS_KEYWORD
 
 router = Router()
 
 ITEMS_PER_PAGE = 5
 TERMS_PER_PAGE = 5
+FUZZY_RESULTS_LIMIT = 5
+
+# Категория в БД для префикса callback_data
+PREFIX_CATEGORIES = {"courses": "course", "resources": "resource"}
+CATEGORY_PREFIXES = {category: prefix for prefix, category in PREFIX_CATEGORIES.items()}
+
+# Форматирование строк (id, name, description, link) для страниц каталога
+CATALOG_FORMATTERS = {
+    "course": lambda c: f"📚 {c[1]}\n{c[2]}\n{c[3] or 'Ссылки нет'}",
+    "resource": lambda r: f"🔗 {r[1]}\n{r[2]}\n{r[3]}",
+}
+
+# Кэш готовых страниц (текст + клавиатура); сбрасывается вместе с категорией в catalog_cache
+RENDERED_PAGES_CACHE_SIZE = int(os.getenv("RENDERED_PAGES_CACHE_SIZE", "512"))
+rendered_pages = CatalogCache(maxsize=RENDERED_PAGES_CACHE_SIZE)
+catalog_cache.add_invalidation_listener(rendered_pages.invalidate)
 
 class GotoPage(StatesGroup):
     waiting_for_page_number = State()
 
 # ---------- БАЗОВАЯ ПАГИНАЦИЯ ----------
-def get_pagination_keyboard(page: int, total_pages: int, prefix: str) -> InlineKeyboardMarkup:
+# callback_data страниц: "<префикс>:<страница>:<курсор>"
+def get_pagination_keyboard(page: int, total_pages: int, prefix: str,
+                            prev_cursor: Optional[str] = None, next_cursor: Optional[str] = None) -> InlineKeyboardMarkup:
     buttons = []
 
-    if page > 0:
-        buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"{prefix}:{page - 1}"))
-    if page < total_pages - 1:
-        buttons.append(InlineKeyboardButton(text="➡️ Вперёд", callback_data=f"{prefix}:{page + 1}"))
+    if prev_cursor:
+        buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"{prefix}:{page - 1}:{prev_cursor}"))
+    if next_cursor:
+        buttons.append(InlineKeyboardButton(text="➡️ Вперёд", callback_data=f"{prefix}:{page + 1}:{next_cursor}"))
     buttons.append(InlineKeyboardButton(text="🔢 Перейти к странице", callback_data=f"{prefix}:goto"))
 
     keyboard = [buttons[:-1], [buttons[-1]]] if len(buttons) > 2 else [buttons]
     return InlineKeyboardMarkup(inline_keyboard=keyboard)
 
-async def send_paginated_data(message: Message, items: list, formatter, callback_prefix: str, page: int = 0):
-    total_pages = (len(items) + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
-    start = page * ITEMS_PER_PAGE
-    end = start + ITEMS_PER_PAGE
-    current_items = items[start:end]
+def format_paginated_page(items: list, formatter, callback_prefix: str, page: int, total_items: int,
+                          cursor: Optional[str], has_more: bool) -> Tuple[str, InlineKeyboardMarkup]:
+    total_pages = max(1, (total_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE)
+    prev_cursor, next_cursor = db.page_cursors(items, page, cursor, has_more)
 
-    text = "\n\n".join(formatter(item) for item in current_items)
+    text = "\n\n".join(formatter(item) for item in items)
     text += f"\n\n📄 Страница {page + 1} из {total_pages}"
 
-    keyboard = get_pagination_keyboard(page, total_pages, callback_prefix)
-    await message.answer(text, reply_markup=keyboard)
+    keyboard = get_pagination_keyboard(page, total_pages, callback_prefix, prev_cursor, next_cursor)
+    return text, keyboard
+
+@cached(lambda category, *args, **kwargs: category, cache=rendered_pages)
+async def render_catalog_page(category: str, page: int = 0, cursor: Optional[str] = None):
+    """Готовые текст и клавиатура страницы курсов/ресурсов; None, если страница пуста."""
+    items, has_more = await db.get_catalog_page(category, ITEMS_PER_PAGE, cursor, offset=page * ITEMS_PER_PAGE)
+    if not items:
+        return None
+    total_items = await db.get_total_items_count(category)
+    return format_paginated_page(items, CATALOG_FORMATTERS[category], CATEGORY_PREFIXES[category],
+                                 page, total_items, cursor, has_more)
+
+async def send_paginated_data(message: Message, category: str, page: int = 0, cursor: Optional[str] = None,
+                              edit: bool = False):
+    """Отправляет страницу каталога; при edit=True заменяет текст и клавиатуру в message."""
+    rendered = await render_catalog_page(category, page, cursor)
+    text, keyboard = rendered if rendered else ("ℹ️ Информация отсутствует.", None)
+    if edit:
+        await message.edit_text(text, reply_markup=keyboard)
+    else:
+        await message.answer(text, reply_markup=keyboard)
 
 
 
 
 # ---------- ТЕРМИНЫ: ФУНКЦИИ И КЛАВИАТУРА ----------
-def get_terms_pagination_keyboard(letter: str, page: int, has_next_page: bool) -> InlineKeyboardMarkup:
+# callback_data страниц: "terms_letter:<буква>:<страница>:<курсор>" и "terms_all:<страница>:<курсор>"
+def get_terms_pagination_keyboard(letter: str, page: int, prev_cursor: Optional[str], next_cursor: Optional[str]) -> InlineKeyboardMarkup:
     buttons = []
-    if page > 0:
-        buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"terms_letter:{letter}:{page - 1}"))
-    buttons.append(InlineKeyboardButton(text="Все термины", callback_data="terms_all:0"))
-    if has_next_page:
-        buttons.append(InlineKeyboardButton(text="➡️ Вперёд", callback_data=f"terms_letter:{letter}:{page + 1}"))
+    if prev_cursor:
+        buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"terms_letter:{letter}:{page - 1}:{prev_cursor}"))
+    buttons.append(InlineKeyboardButton(text="Все термины", callback_data="terms_all:0:"))
+    if next_cursor:
+        buttons.append(InlineKeyboardButton(text="➡️ Вперёд", callback_data=f"terms_letter:{letter}:{page + 1}:{next_cursor}"))
     return InlineKeyboardMarkup(inline_keyboard=[buttons])
 
-def get_terms_by_letter(letter: str, offset: int = 0):
-    conn = sqlite3.connect("bot.db")
-    cursor = conn.cursor()
-    cursor.execute(
-        'SELECT term, definition FROM terms WHERE UPPER(SUBSTR(term, 1, 1)) = ? ORDER BY term LIMIT ? OFFSET ?',
-        (letter.upper(), TERMS_PER_PAGE + 1, offset)
-    )
-    terms = cursor.fetchall()
-    conn.close()
-    return terms
-
-def get_all_terms(offset: int = 0):
-    conn = sqlite3.connect("bot.db")
-    cursor = conn.cursor()
-    cursor.execute(
-        'SELECT term, definition FROM terms ORDER BY term LIMIT ? OFFSET ?',
-        (TERMS_PER_PAGE + 1, offset)
-    )
-    terms = cursor.fetchall()
-    conn.close()
-    return terms
+def get_all_terms_keyboard(page: int, prev_cursor: Optional[str], next_cursor: Optional[str]) -> InlineKeyboardMarkup:
+    buttons = []
+    if prev_cursor:
+        buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"terms_all:{page - 1}:{prev_cursor}"))
+    if next_cursor:
+        buttons.append(InlineKeyboardButton(text="➡️ Вперёд", callback_data=f"terms_all:{page + 1}:{next_cursor}"))
+    buttons.append(InlineKeyboardButton(text="🔙 По буквам", callback_data="terms_letters_back"))
+    return InlineKeyboardMarkup(inline_keyboard=[buttons])
+
+def parse_page_callback(parts: List[str]) -> Tuple[int, Optional[str]]:
+    """Номер страницы и курсор из частей callback_data; без курсора — первая страница."""
+    cursor = parts[1] if len(parts) > 1 and parts[1] else None
+    page = int(parts[0]) if cursor else 0
+    return page, cursor
+
+async def get_terms_by_letter(letter: str, cursor: Optional[str] = None, page: int = 0):
+    return await db.get_terms_by_letter(letter, TERMS_PER_PAGE, cursor, offset=page * TERMS_PER_PAGE)
+
+async def get_all_terms(cursor: Optional[str] = None, page: int = 0):
+    return await db.get_terms_page(TERMS_PER_PAGE, cursor, offset=page * TERMS_PER_PAGE)
 
 def format_terms_response(terms: list, title: str) -> str:
     response = f"📖 IT термины ({title}):\n\n"
-    for term in terms:
-        response += f"<b>{term[0]}</b>\n{term[1]}\n\n"
+    for _, term, definition in terms:
+        response += f"<b>{term}</b>\n{definition}\n\n"
     return response.strip()
 
+@cached("term", cache=rendered_pages)
+async def render_terms_by_letter(letter: str, page: int = 0, cursor: Optional[str] = None):
+    """Текст и клавиатура страницы терминов на букву; None, если терминов нет."""
+    terms, has_more = await get_terms_by_letter(letter, cursor, page)
+    if not terms:
+        return None
+    prev_cursor, next_cursor = db.page_cursors(terms, page, cursor, has_more)
+    title = f"на букву {letter}" if page == 0 else f"на букву {letter} (страница {page + 1})"
+    return format_terms_response(terms, title), get_terms_pagination_keyboard(letter, page, prev_cursor, next_cursor)
+
+@cached("term", cache=rendered_pages)
+async def render_all_terms(page: int = 0, cursor: Optional[str] = None):
+    """Текст и клавиатура страницы полного списка терминов; None, если терминов нет."""
+    terms, has_more = await get_all_terms(cursor, page)
+    if not terms:
+        return None
+    prev_cursor, next_cursor = db.page_cursors(terms, page, cursor, has_more)
+    title = "все" if page == 0 else f"все (страница {page + 1})"
+    return format_terms_response(terms, title), get_all_terms_keyboard(page, prev_cursor, next_cursor)
+
 # ---------- СЛОВАРЬ ----------
 @router.message(F.text == "📖 Словарь IT терминов")
 async def show_terms_menu(message: Message):
@@ -90,70 +154,47 @@ async def show_terms_menu(message: Message):
 @router.message(F.text.func(lambda text: len(text.strip()) == 1 and text.strip().isalpha()))
 async def show_terms_by_letter(message: Message):
     letter = message.text.strip().upper()
-    terms = get_terms_by_letter(letter)
-    if not terms:
+    rendered = await render_terms_by_letter(letter)
+    if not rendered:
         await message.answer(f"😕 Терминов на букву '{letter}' не найдено")
         return
 
-    has_next_page = len(terms) > TERMS_PER_PAGE
-    response = format_terms_response(terms[:TERMS_PER_PAGE], f"на букву {letter}")
-    keyboard = get_terms_pagination_keyboard(letter, 0, has_next_page)
-
+    response, keyboard = rendered
     await message.answer(response, parse_mode="HTML", reply_markup=keyboard)
 
 @router.callback_query(F.data.startswith("terms_letter:"))
 async def handle_terms_letter_pagination(call: CallbackQuery):
-    _, letter, page_str = call.data.split(":")
-    page = int(page_str)
-    terms = get_terms_by_letter(letter, page * TERMS_PER_PAGE)
-    if not terms:
+    _, letter, *parts = call.data.split(":")
+    page, cursor = parse_page_callback(parts)
+    rendered = await render_terms_by_letter(letter, page, cursor)
+    if not rendered:
         await call.answer("😕 Больше терминов не найдено")
         return
 
-    has_next_page = len(terms) > TERMS_PER_PAGE
-    response = format_terms_response(terms[:TERMS_PER_PAGE], f"на букву {letter} (страница {page + 1})")
-    keyboard = get_terms_pagination_keyboard(letter, page, has_next_page)
-
+    response, keyboard = rendered
     await call.message.edit_text(response, parse_mode="HTML", reply_markup=keyboard)
     await call.answer()
 
-@router.message(F.text.strip().lower() == "все")
+@router.message(F.text.strip().lower() == ALL_TERMS_KEYWORD)
 async def show_all_terms(message: Message):
-    terms = get_all_terms()
-    if not terms:
+    rendered = await render_all_terms()
+    if not rendered:
         await message.answer("😕 В словаре пока нет терминов")
         return
 
-    has_next_page = len(terms) > TERMS_PER_PAGE
-    response = format_terms_response(terms[:TERMS_PER_PAGE], "все")
-    buttons = [
-        InlineKeyboardButton(text="➡️ Вперёд", callback_data="terms_all:1")
-    ] if has_next_page else []
-    buttons.append(InlineKeyboardButton(text="🔙 По буквам", callback_data="terms_letters_back"))
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[buttons])
-
+    response, keyboard = rendered
     await message.answer(response, parse_mode="HTML", reply_markup=keyboard)
 
 @router.callback_query(F.data.startswith("terms_all:"))
 async def handle_all_terms_pagination(call: CallbackQuery):
-    _, page_str = call.data.split(":")
-    page = int(page_str)
-    terms = get_all_terms(page * TERMS_PER_PAGE)
-    if not terms:
+    _, *parts = call.data.split(":")
+    page, cursor = parse_page_callback(parts)
+    rendered = await render_all_terms(page, cursor)
+    if not rendered:
         await call.answer("😕 Больше терминов не найдено")
         return
 
-    has_next_page = len(terms) > TERMS_PER_PAGE
-    response = format_terms_response(terms[:TERMS_PER_PAGE], f"все (страница {page + 1})")
-
-    buttons = []
-    if page > 0:
-        buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"terms_all:{page - 1}"))
-    if has_next_page:
-        buttons.append(InlineKeyboardButton(text="➡️ Вперёд", callback_data=f"terms_all:{page + 1}"))
-    buttons.append(InlineKeyboardButton(text="🔙 По буквам", callback_data="terms_letters_back"))
-
-    keyboard = InlineKeyboardMarkup(inline_keyboard=[buttons])
+    response, keyboard = rendered
     await call.message.edit_text(response, parse_mode="HTML", reply_markup=keyboard)
     await call.answer()
 
@@ -165,51 +206,77 @@ async def handle_letters_back(call: CallbackQuery):
     )
     await call.answer()
 
-@router.message(F.text.func(lambda text: len(text.strip()) > 1 and text.strip().isalpha()))
-async def handle_multiple_letters(message: Message):
-    await message.answer("ℹ️ Пожалуйста, введите только одну букву для поиска терминов")
+# Нечёткий поиск: слово или фраза вместо одной буквы
+@router.message(F.text.func(lambda text: len(text.strip()) > 1 and text.strip().replace(" ", "").replace("-", "").isalpha()))
+async def handle_fuzzy_term_lookup(message: Message):
+    query = message.text.strip()
+    matches = trigram_index.search(query, FUZZY_RESULTS_LIMIT)
+    if not matches:
+        await message.answer(f"😕 Термин «{escape(query)}» не найден.\nℹ️ Для просмотра по алфавиту введите одну букву")
+        return
+
+    term, definition, _ = matches[0]
+    if term.casefold() == query.casefold():
+        await message.answer(f"📖 <b>{escape(term)}</b>\n{escape(definition)}", parse_mode="HTML")
+        return
+
+    response = "🤔 Возможно, вы имели в виду:\n\n"
+    for term, definition, _ in matches:
+        response += f"<b>{escape(term)}</b>\n{escape(definition)}\n\n"
+    await message.answer(response.strip(), parse_mode="HTML")
 
 # ---------- ОБЩАЯ ПАГИНАЦИЯ ----------
-@router.callback_query(F.data.regexp(r'^(courses|resources):(\d+)$'))
+# Навигация редактирует сообщение со страницей, а не присылает новое
+@router.callback_query(F.data.regexp(r'^(courses|resources):(\d+)(:[np]\d+)?$'))
 async def paginate_callback(call: CallbackQuery):
-    prefix, page = call.data.split(":")
+    prefix, page, *rest = call.data.split(":")
     page = int(page)
+    cursor = rest[0] if rest else None
     if prefix == "courses":
         from handlers.main_handler import load_courses
-        await load_courses(call.message, page=page)
+        await load_courses(call.message, page=page, cursor=cursor, edit=True)
     elif prefix == "resources":
         from handlers.main_handler import load_resources
-        await load_resources(call.message, page=page)
+        await load_resources(call.message, page=page, cursor=cursor, edit=True)
     await call.answer()
 
 @router.callback_query(F.data.regexp(r'^(courses|resources):goto$'))
 async def goto_page_prompt(call: CallbackQuery, state: FSMContext):
     prefix = call.data.split(":")[0]
-    await state.update_data(prefix=prefix)
+    # Запоминаем сообщение со страницей, чтобы потом отредактировать его
+    await state.update_data(prefix=prefix, chat_id=call.message.chat.id, message_id=call.message.message_id)
     await state.set_state(GotoPage.waiting_for_page_number)
     await call.message.answer("🔢 Введите номер страницы, на которую хотите перейти:")
     await call.answer()
 
 @router.message(StateFilter(GotoPage.waiting_for_page_number))
-async def process_goto_page(message: Message, state: FSMContext):
+async def process_goto_page(message: Message, state: FSMContext, bot: Bot):
     user_data = await state.get_data()
     prefix = user_data.get("prefix")
+    category = PREFIX_CATEGORIES.get(prefix, "")
 
     try:
         page = int(message.text.strip()) - 1
-        if page < 0:
+        total_items = await db.get_total_items_count(category)
+        if page < 0 or page * ITEMS_PER_PAGE >= total_items:
             raise ValueError
-
-        if prefix == "courses":
-            from handlers.main_handler import load_courses
-            await load_courses(message, page=page)
-        elif prefix == "resources":
-            from handlers.main_handler import load_resources
-            await load_resources(message, page=page)
-
-        await state.clear()
     except ValueError:
         await message.answer("🚫 Неверный номер страницы. Попробуйте снова.")
+        return
+
+    await state.clear()
+    rendered = await render_catalog_page(category, page)
+    if not rendered:
+        await message.answer("ℹ️ Информация отсутствует.")
+        return
+
+    text, keyboard = rendered
+    try:
+        await bot.edit_message_text(text, chat_id=user_data["chat_id"], message_id=user_data["message_id"],
+                                    reply_markup=keyboard)
+    except (KeyError, TelegramBadRequest):
+        # Исходное сообщение удалено или слишком старое для редактирования
+        await message.answer(text, reply_markup=keyboard)
 
 #Группа
 async def send_grouped_blocks(message: Message, items: list, formatter, block_size: int = 5, parse_mode=None):
@@ -1,13 +1,30 @@
 import math
 import logging
 from ssl import SSLContext
-from typing import List, Tuple, Any
+from typing import List, Set, Tuple, Any, Optional
 from aiogram import Router, F
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
+from aiogram.fsm.context import FSMContext
 
 logger = logging.getLogger(__name__)
 
 ADMIN_DELETE_ITEMS_PER_PAGE = 10
+# Сколько элементов можно отметить для удаления за один раз
+ADMIN_SELECT_MAX_ITEMS = 200
+
+# Кнопки элементов обычного режима удаления: (префикс callback_data, индекс ID, индекс названия)
+DELETE_ITEM_BUTTONS = {
+    "course": ("del_course_by_id", 0, 1),
+    "resource": ("del_resource_by_id", 0, 1),
+    "term": ("del_term_by_name", 0, 0),
+    "group": ("del_group_by_id", 0, 1),
+}
+DELETE_PAGE_TITLES = {
+    "course": "🗑️ Выберите курс для удаления:",
+    "resource": "🗑️ Выберите ресурс для удаления:",
+    "term": "🗑️ Выберите термин для удаления:",
+    "group": "🗑️ Выберите группу для удаления:",
+}
 
 async def create_paginated_keyboard(
     items: List[Tuple], 
@@ -18,17 +35,31 @@ async def create_paginated_keyboard(
     item_callback_prefix: str, 
     item_id_index: int, 
     item_name_index: int, 
-    row_width: int = 2
+    row_width: int = 2,
+    item_cursor_index: Optional[int] = None,
+    selected: Optional[Set[int]] = None
 ) -> InlineKeyboardMarkup:
+    """Клавиатура страницы удаления.
+
+    Если передан selected (множество rowid), клавиатура строится в режиме выбора:
+    кнопки элементов переключают отметку, внизу — подтверждение и отмена.
+    Для режима выбора нужен item_cursor_index (rowid элемента).
+    """
 
     all_rows = []
     item_buttons = []
 
     total_pages = math.ceil(total_items / items_per_page)
+    category = pagination_callback_prefix.rsplit("_", 1)[-1]
 
     for item in items:
         item_identifier = item[item_id_index]
         button_text = item[item_name_index]
+        if selected is not None:
+            rowid = item[item_cursor_index]
+            mark = "✅" if rowid in selected else "⬜"
+            item_buttons.append(InlineKeyboardButton(text=f"{mark} {button_text}", callback_data=f"sel_toggle:{category}:{rowid}"))
+            continue
         callback_data = f"{item_callback_prefix}:{item_identifier}:page:{page}"
 
         if len(callback_data.encode('utf-8')) > 64:
@@ -39,38 +70,48 @@ async def create_paginated_keyboard(
         all_rows.append(item_buttons[i : i + row_width])
 
     # Добавляем кнопки пагинации
+    # Курсоры keyset-пагинации: соседняя страница ищется от первой/последней строки текущей
+    prev_cursor = next_cursor = ""
+    if item_cursor_index is not None and items:
+        prev_cursor = f"p{items[0][item_cursor_index]}"
+        next_cursor = f"n{items[-1][item_cursor_index]}"
+
     navigation_buttons = []
     if page > 1:
-        navigation_buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"{pagination_callback_prefix}:{page - 1}"))
+        navigation_buttons.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"{pagination_callback_prefix}:{page - 1}:{prev_cursor}"))
 
     if total_pages > 0:
         navigation_buttons.append(InlineKeyboardButton(text=f"{page}/{total_pages}", callback_data="ignore_page_info")) # Изменено на ignore_page_info
 
     if page < total_pages:
-        navigation_buttons.append(InlineKeyboardButton(text="➡️ Далее", callback_data=f"{pagination_callback_prefix}:{page + 1}"))
+        navigation_buttons.append(InlineKeyboardButton(text="➡️ Далее", callback_data=f"{pagination_callback_prefix}:{page + 1}:{next_cursor}"))
 
     if navigation_buttons:
         all_rows.append(navigation_buttons) 
 
-    category = pagination_callback_prefix.replace("navigate_delete_", "")
-    all_rows.append([InlineKeyboardButton(text="🔢 Перейти на страницу", callback_data=f"goto_delete_page:{category}")])
+    if selected is not None:
+        all_rows.append([InlineKeyboardButton(text=f"🗑 Удалить выбранные ({len(selected)})", callback_data=f"sel_confirm:{category}")])
+        all_rows.append([InlineKeyboardButton(text="↩️ Отменить выбор", callback_data=f"sel_cancel:{category}")])
+    else:
+        all_rows.append([InlineKeyboardButton(text="🔢 Перейти на страницу", callback_data=f"goto_delete_page:{category}")])
+        if item_cursor_index is not None:
+            all_rows.append([InlineKeyboardButton(text="☑️ Выбрать несколько", callback_data=f"sel_start:{category}")])
     keyboard = InlineKeyboardMarkup(inline_keyboard=all_rows)
 
     return keyboard
 
 # --- Функции для регистрации обработчиков пагинации (добавляется обработчик для goto_delete_page) ---
 
-def register_pagination_handlers(router: Router, check_admin_access_func, get_items_page_func, get_total_items_count_func):
+def register_pagination_handlers(router: Router, get_items_page_func, get_total_items_count_func, delete_items_func):
 
     @router.callback_query(F.data.startswith("navigate_delete_"))
     async def navigate_delete_page(callback: CallbackQuery):
-        if not await check_admin_access_func(callback): return
-
         try:
             parts = callback.data.split(":")
             pagination_prefix = parts[0] 
             category = pagination_prefix.replace("navigate_delete_", "")
             page_data = parts[1] 
+            cursor = parts[2] if len(parts) > 2 and parts[2] else None
 
             if page_data == "current_page_info":
                  await callback.answer("Вы на текущей странице.", show_alert=False)
@@ -86,7 +127,7 @@ def register_pagination_handlers(router: Router, check_admin_access_func, get_it
                  await callback.answer("Неверный номер страницы.")
                  return
 
-            items = await get_items_page_func(category, page, ADMIN_DELETE_ITEMS_PER_PAGE)
+            items = await get_items_page_func(category, page, ADMIN_DELETE_ITEMS_PER_PAGE, cursor)
 
             if not items and total_items > 0:
                  if total_pages > 0:
@@ -149,6 +190,7 @@ def register_pagination_handlers(router: Router, check_admin_access_func, get_it
                 item_callback_prefix=item_callback_prefix_base, 
                 item_id_index=item_id_index,
                 item_name_index=item_name_index,
+                item_cursor_index=2,
             )
             message_text = f"🗑️ Выберите {category.capitalize()} для удаления:"
             if category == "course": message_text = "🗑️ Выберите курс для удаления:"
@@ -166,12 +208,123 @@ def register_pagination_handlers(router: Router, check_admin_access_func, get_it
             logger.error(f"Ошибка в обработчике навигации ({category}, page {page_data}): {e}")
             await callback.answer("⚠️ Произошла ошибка при загрузке страницы.", show_alert=True)
 
+    # Кнопка с номером страницы ничего не делает, только гасит "часики" на кнопке
+    @router.callback_query(F.data == "ignore_page_info")
+    async def ignore_page_info(callback: CallbackQuery):
+        await callback.answer()
+
+    # --- РЕЖИМ ВЫБОРА: отметить несколько элементов и удалить их одним подтверждением ---
+    # Отмеченные rowid, категория и текущая страница хранятся в данных FSM
+    async def show_selection_page(callback: CallbackQuery, state: FSMContext, category: str,
+                                  page: int, cursor: Optional[str], selected: Set[int]):
+        total_items = await get_total_items_count_func(category)
+        items = await get_items_page_func(category, page, ADMIN_DELETE_ITEMS_PER_PAGE, cursor)
+        if not items and page > 1:
+            page, cursor = 1, None
+            items = await get_items_page_func(category, page, ADMIN_DELETE_ITEMS_PER_PAGE)
+        await state.update_data(select_category=category, selected=sorted(selected), select_page=page, select_cursor=cursor)
+
+        item_callback_prefix, item_id_index, item_name_index = DELETE_ITEM_BUTTONS[category]
+        keyboard = await create_paginated_keyboard(
+            items=items,
+            page=page,
+            items_per_page=ADMIN_DELETE_ITEMS_PER_PAGE,
+            total_items=total_items,
+            pagination_callback_prefix=f"navigate_select_{category}",
+            item_callback_prefix=item_callback_prefix,
+            item_id_index=item_id_index,
+            item_name_index=item_name_index,
+            item_cursor_index=2,
+            selected=selected,
+        )
+        await callback.message.edit_text(f"☑️ Отметьте элементы для удаления (выбрано: {len(selected)}):", reply_markup=keyboard)
+
+    async def show_delete_page(callback: CallbackQuery, category: str):
+        total_items = await get_total_items_count_func(category)
+        items = await get_items_page_func(category, 1, ADMIN_DELETE_ITEMS_PER_PAGE)
+        if not items:
+            await callback.message.edit_text("ℹ️ Элементы отсутствуют.")
+            return
+        item_callback_prefix, item_id_index, item_name_index = DELETE_ITEM_BUTTONS[category]
+        keyboard = await create_paginated_keyboard(
+            items=items,
+            page=1,
+            items_per_page=ADMIN_DELETE_ITEMS_PER_PAGE,
+            total_items=total_items,
+            pagination_callback_prefix=f"navigate_delete_{category}",
+            item_callback_prefix=item_callback_prefix,
+            item_id_index=item_id_index,
+            item_name_index=item_name_index,
+            item_cursor_index=2,
+        )
+        await callback.message.edit_text(DELETE_PAGE_TITLES[category], reply_markup=keyboard)
+
+    async def get_selection(state: FSMContext, category: str) -> Set[int]:
+        data = await state.get_data()
+        return set(data.get("selected", [])) if data.get("select_category") == category else set()
+
+    async def clear_selection(state: FSMContext):
+        data = await state.get_data()
+        for key in ("select_category", "selected", "select_page", "select_cursor"):
+            data.pop(key, None)
+        await state.set_data(data)
+
+    @router.callback_query(F.data.startswith("sel_start:"))
+    async def selection_start(callback: CallbackQuery, state: FSMContext):
+        category = callback.data.split(":")[1]
+        if category not in DELETE_ITEM_BUTTONS:
+            await callback.answer("⚠️ Неизвестная категория.", show_alert=True)
+            return
+        await show_selection_page(callback, state, category, 1, None, set())
+        await callback.answer()
+
+    @router.callback_query(F.data.startswith("navigate_select_"))
+    async def selection_navigate(callback: CallbackQuery, state: FSMContext):
+        parts = callback.data.split(":")
+        category = parts[0].replace("navigate_select_", "")
+        page = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 1
+        cursor = parts[2] if len(parts) > 2 and parts[2] else None
+        await show_selection_page(callback, state, category, page, cursor, await get_selection(state, category))
+        await callback.answer()
+
+    @router.callback_query(F.data.startswith("sel_toggle:"))
+    async def selection_toggle(callback: CallbackQuery, state: FSMContext):
+        _, category, rowid = callback.data.split(":")
+        rowid = int(rowid)
+        data = await state.get_data()
+        selected = await get_selection(state, category)
+        if rowid in selected:
+            selected.discard(rowid)
+        elif len(selected) >= ADMIN_SELECT_MAX_ITEMS:
+            await callback.answer(f"Можно выбрать не больше {ADMIN_SELECT_MAX_ITEMS} элементов за раз.", show_alert=True)
+            return
+        else:
+            selected.add(rowid)
+        await show_selection_page(callback, state, category, data.get("select_page", 1), data.get("select_cursor"), selected)
+        await callback.answer()
+
+    @router.callback_query(F.data.startswith("sel_confirm:"))
+    async def selection_confirm(callback: CallbackQuery, state: FSMContext):
+        category = callback.data.split(":")[1]
+        selected = await get_selection(state, category)
+        if not selected:
+            await callback.answer("Ничего не выбрано.")
+            return
+        deleted = await delete_items_func(category, sorted(selected))
+        await clear_selection(state)
+        await show_delete_page(callback, category)
+        await callback.answer(f"Удалено: {deleted}", show_alert=True)
+
+    @router.callback_query(F.data.startswith("sel_cancel:"))
+    async def selection_cancel(callback: CallbackQuery, state: FSMContext):
+        category = callback.data.split(":")[1]
+        await clear_selection(state)
+        await show_delete_page(callback, category)
+        await callback.answer()
+
     # --- ОБРАБОТЧИК ДЛЯ КНОПКИ "ПЕРЕЙТИ НА СТРАНИЦУ" ---
     @router.callback_query(F.data.startswith("goto_delete_page:"))
     async def ask_for_page_number(callback: CallbackQuery, state: SSLContext):
-        if not await check_admin_access_func(callback): 
-            return
-
         try:
             category = callback.data.split(":")[1] 
 
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Union
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+
+from utils.metrics import Gauge, registry
+
+logger = logging.getLogger(__name__)
+
+# Лимиты Telegram: ~30 сообщений в секунду всего, ~1 в секунду в личный чат
+# (с короткими всплесками) и ~20 в минуту в группу
+SEND_RATE_GLOBAL = float(os.getenv("SEND_RATE_GLOBAL", "30"))
+SEND_RATE_CHAT = float(os.getenv("SEND_RATE_CHAT", "1"))
+SEND_BURST_CHAT = float(os.getenv("SEND_BURST_CHAT", "3"))
+SEND_RATE_GROUP = float(os.getenv("SEND_RATE_GROUP", str(20 / 60)))
+SEND_BURST_GROUP = float(os.getenv("SEND_BURST_GROUP", "3"))
+# Сколько корзин чатов держать в памяти (простаивающие вытесняются; корзины с
+# ожидающими запросами не удаляются, даже если предел превышен)
+MAX_TRACKED_CHATS = int(os.getenv("MAX_TRACKED_CHATS", "10000"))
+
+
+class TokenBucket:
+    """Корзина токенов с резервированием: каждый вызов reserve() занимает токен
+    и возвращает, сколько секунд нужно подождать до отправки. Баланс может уйти
+    в минус — так ожидающие запросы выстраиваются в очередь по порядку."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def is_idle(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class OutboundRateLimiter(BaseRequestMiddleware):
+    """Middleware сессии бота: все запросы к Bot API с chat_id (отправка,
+    редактирование, удаление сообщений) проходят через общую и початовую
+    корзины токенов; запросы ждут своей очереди вместо получения 429 от Telegram."""
+
+    def __init__(self):
+        self._global = TokenBucket(SEND_RATE_GLOBAL, SEND_RATE_GLOBAL)
+        self._chats: "OrderedDict[Union[int, str], TokenBucket]" = OrderedDict()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.sent: Counter = Counter()
+
+    def _chat_bucket(self, chat_id: Union[int, str]) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # У групп и каналов отрицательный id или @username
+            is_group = not isinstance(chat_id, int) or chat_id < 0
+            bucket = TokenBucket(SEND_RATE_GROUP, SEND_BURST_GROUP) if is_group else TokenBucket(SEND_RATE_CHAT, SEND_BURST_CHAT)
+            self._chats[chat_id] = bucket
+            if len(self._chats) > MAX_TRACKED_CHATS:
+                self._evict(chat_id)
+        self._chats.move_to_end(chat_id)
+        return bucket
+
+    def _evict(self, keep: Union[int, str]) -> None:
+        """Удаляет простаивающие корзины, начиная с давно не использованных, пока
+        их не станет MAX_TRACKED_CHATS. Корзины с ожидающими запросами остаются:
+        без них лимит чата сбросился бы посреди всплеска."""
+        for chat_id, bucket in list(self._chats.items()):
+            if len(self._chats) <= MAX_TRACKED_CHATS:
+                break
+            if chat_id != keep and bucket.is_idle():
+                del self._chats[chat_id]
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        wait = max(self._global.reserve(), self._chat_bucket(chat_id).reserve())
+        if wait > 0:
+            self.delayed += 1
+            self.total_wait += wait
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self.queue_depth -= 1
+        self.sent[type(method).__name__] += 1
+        return await make_request(bot, method)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "delayed": self.delayed,
+            "total_wait": self.total_wait,
+            "tracked_chats": len(self._chats),
+            "sent": dict(self.sent),
+        }
+
+
+outbound_limiter = OutboundRateLimiter()
+registry.register(Gauge("bot_outbound_queue_depth", "Запросов к Bot API в очереди отправки",
+                        lambda: outbound_limiter.queue_depth))
+registry.register(Gauge("bot_outbound_delayed_requests", "Запросов к Bot API, задержанных очередью с момента запуска",
+                        lambda: outbound_limiter.delayed))
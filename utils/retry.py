@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+import random
+from collections import Counter
+from typing import Any, Dict
+
+from aiogram import Bot
+from aiohttp import ClientConnectorError
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import (
+    TelegramEntityTooLarge,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.methods import GetUpdates, TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+
+logger = logging.getLogger(__name__)
+
+# Бюджет повторов на один запрос: число попыток и суммарное время ожидания
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "5"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+# Экспоненциальная задержка для сетевых ошибок и 5xx: base * 2^n, не больше cap
+RETRY_BACKOFF_BASE = float(os.getenv("RETRY_BACKOFF_BASE", "0.5"))
+RETRY_BACKOFF_CAP = float(os.getenv("RETRY_BACKOFF_CAP", "10"))
+
+# После сетевой ошибки (в том числе таймаута) нельзя знать, обработал ли Telegram
+# запрос, поэтому такие ошибки повторяются только для методов, повтор которых
+# ничего не дублирует. Остальные методы повторяются, только если соединение
+# не удалось установить и запрос точно не был отправлен
+IDEMPOTENT_PREFIXES = ("Get", "Edit", "Set")
+IDEMPOTENT_METHODS = {"AnswerCallbackQuery", "AnswerInlineQuery", "DeleteWebhook"}
+
+
+def is_idempotent(name: str) -> bool:
+    return name.startswith(IDEMPOTENT_PREFIXES) or name in IDEMPOTENT_METHODS
+
+
+def is_connection_error(error: TelegramNetworkError) -> bool:
+    """Ошибка установки соединения: aiogram выбрасывает TelegramNetworkError внутри except,
+    поэтому исходная ошибка aiohttp доступна в __context__."""
+    return isinstance(error.__context__, ClientConnectorError)
+
+
+class RetryMiddleware(BaseRequestMiddleware):
+    """Middleware сессии бота: повторяет запрос к Bot API после 429
+    (ждёт retry_after) и после временных сетевых ошибок и ошибок сервера
+    (экспоненциальная задержка со случайным разбросом), пока не исчерпан бюджет.
+    Сетевые ошибки неидемпотентных методов (sendMessage и т. п.) повторяются,
+    только если запрос не был отправлен."""
+
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, max_delay: float = RETRY_MAX_DELAY,
+                 backoff_base: float = RETRY_BACKOFF_BASE, backoff_cap: float = RETRY_BACKOFF_CAP):
+        self.max_attempts = max_attempts
+        self.max_delay = max_delay
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retries: Counter = Counter()
+        self.retry_after: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.retry_after_too_long: Counter = Counter()
+        self.not_retried: Counter = Counter()
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": случайная задержка от 0 до base * 2^attempt
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        # У long polling свой цикл повторов
+        if isinstance(method, GetUpdates):
+            return await make_request(bot, method)
+
+        name = type(method).__name__
+        waited = 0.0
+        attempt = 0
+        while True:
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                delay = float(e.retry_after)
+                self.retry_after[name] += 1
+                error = e
+            except TelegramEntityTooLarge:
+                raise
+            except TelegramNetworkError as e:
+                if not is_idempotent(name) and not is_connection_error(e):
+                    self.not_retried[name] += 1
+                    logger.error(f"{name}: сетевая ошибка без повтора (запрос мог быть выполнен): {e}")
+                    raise
+                delay = self._backoff(attempt)
+                error = e
+            except TelegramServerError as e:
+                delay = self._backoff(attempt)
+                error = e
+
+            attempt += 1
+            if isinstance(error, TelegramRetryAfter) and delay > self.max_delay:
+                self.retry_after_too_long[name] += 1
+                logger.error(f"{name}: Telegram просит подождать {delay:.0f} с, "
+                             f"это больше RETRY_MAX_DELAY ({self.max_delay:.0f} с), запрос не повторяется")
+                raise error
+            if attempt >= self.max_attempts or waited + delay > self.max_delay:
+                self.failures[name] += 1
+                logger.error(f"{name}: бюджет повторов исчерпан после {attempt} попыток: {error}")
+                raise error
+            self.retries[name] += 1
+            waited += delay
+            logger.warning(f"{name}: попытка {attempt} не удалась ({error}), повтор через {delay:.1f} с")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "retries": dict(self.retries),
+            "retry_after": dict(self.retry_after),
+            "failures": dict(self.failures),
+            "retry_after_too_long": dict(self.retry_after_too_long),
+            "not_retried": dict(self.not_retried),
+        }
+
+
+retry_middleware = RetryMiddleware()
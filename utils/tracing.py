@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject, Update
+
+logger = logging.getLogger(__name__)
+
+# Обновления дольше порога (мс) попадают в журнал медленных обновлений
+SLOW_UPDATE_THRESHOLD_MS = float(os.getenv("SLOW_UPDATE_THRESHOLD_MS", "1000"))
+# Файл журнала (JSON по строке на обновление); если не задан — пишется в лог с уровнем WARNING
+SLOW_LOG_PATH = os.getenv("SLOW_LOG_PATH", "")
+# Сколько отдельных вызовов БД и Bot API хранить в одной трассе
+TRACE_MAX_SPANS = 50
+
+slow_log = logging.getLogger("slow_updates")
+slow_log.setLevel(logging.WARNING)
+if SLOW_LOG_PATH:
+    _file_handler = logging.FileHandler(SLOW_LOG_PATH, encoding="utf-8")
+    _file_handler.setFormatter(logging.Formatter("%(message)s"))
+    slow_log.addHandler(_file_handler)
+    slow_log.propagate = False
+
+
+class Trace:
+    """Время этапов обработки одного обновления."""
+
+    __slots__ = ("trace_id", "started", "stages", "spans", "handler")
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.started = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}  # этап -> [суммарное время, число вызовов]
+        self.spans: List[Tuple[str, str, float]] = []  # (этап, имя, время)
+        self.handler: Optional[str] = None
+
+    def record(self, stage: str, name: str, seconds: float) -> None:
+        totals = self.stages.setdefault(stage, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += 1
+        if len(self.spans) < TRACE_MAX_SPANS:
+            self.spans.append((stage, name, seconds))
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+def record_stage(stage: str, name: str, seconds: float) -> None:
+    """Добавляет время этапа в трассу текущего обновления (если она есть)."""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.record(stage, name, seconds)
+
+
+def set_trace_handler(name: str) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.handler = name
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class TracingMiddleware(BaseMiddleware):
+    """Outer-middleware обновлений: присваивает обновлению trace_id, собирает время
+    этапов (хэндлер, БД, Bot API) и пишет медленные обновления в журнал."""
+
+    def __init__(self, threshold_ms: float = SLOW_UPDATE_THRESHOLD_MS):
+        self.threshold = threshold_ms / 1000
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        trace = Trace()
+        token = current_trace.set(trace)
+        data["trace_id"] = trace.trace_id
+        try:
+            return await handler(event, data)
+        finally:
+            current_trace.reset(token)
+            elapsed = time.perf_counter() - trace.started
+            if elapsed >= self.threshold:
+                self._write(trace, event, elapsed)
+
+    @staticmethod
+    def _write(trace: Trace, event: TelegramObject, elapsed: float) -> None:
+        stages = {stage: {"ms": _ms(total), "calls": count} for stage, (total, count) in trace.stages.items()}
+        handler_seconds = trace.stages.get("handler", [0.0])[0]
+        # Всё, что не хэндлер: middleware и проверка фильтров роутеров
+        stages["routing"] = {"ms": _ms(elapsed - handler_seconds)}
+        entry = {
+            "trace_id": trace.trace_id,
+            "update_id": getattr(event, "update_id", None),
+            "event_type": event.event_type if isinstance(event, Update) else type(event).__name__,
+            "handler": trace.handler,
+            "total_ms": _ms(elapsed),
+            "stages": stages,
+            "spans": [{"stage": stage, "name": name, "ms": _ms(seconds)} for stage, name, seconds in trace.spans],
+        }
+        slow_log.warning(json.dumps(entry, ensure_ascii=False))
+
+
+def setup_tracing(dp: Dispatcher) -> None:
+    dp.update.outer_middleware(TracingMiddleware())
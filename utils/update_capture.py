@@ -0,0 +1,177 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject, Update
+
+from keyboards.admin_keyboard import (admin_main_menu, back_to_admin_panel_keyboard, manage_courses_keyboard,
+                                      manage_groups_keyboard, manage_resources_keyboard, manage_terms_keyboard)
+from keyboards.main_keyboard import ALL_TERMS_KEYWORD, get_main_keyboard
+
+logger = logging.getLogger(__name__)
+
+# Файл записи входящих обновлений (JSONL); если не задан — запись выключена
+UPDATE_CAPTURE_PATH = os.getenv("UPDATE_CAPTURE_PATH", "")
+# Ротация: размер одного файла и сколько старых файлов хранить (capture.jsonl.1, .2, ...)
+UPDATE_CAPTURE_MAX_BYTES = int(os.getenv("UPDATE_CAPTURE_MAX_BYTES", str(50 * 1024 * 1024)))
+UPDATE_CAPTURE_BACKUPS = int(os.getenv("UPDATE_CAPTURE_BACKUPS", "5"))
+# Соль для псевдонимов ID; без неё псевдонимы меняются при каждом перезапуске бота
+UPDATE_CAPTURE_SALT = os.getenv("UPDATE_CAPTURE_SALT", "").encode() or os.urandom(16)
+
+# Объекты пользователей и чатов (или их списки): ID заменяется псевдонимом, остальные поля удаляются.
+# Объекты такой формы под другими ключами тоже распознаются (см. _is_identity)
+IDENTITY_KEYS = {"from", "user", "chat", "sender_chat", "via_bot", "forward_from", "forward_from_chat",
+                 "new_chat_members", "left_chat_member", "sender_user", "actor_chat", "voter_chat",
+                 "winners", "chats"}
+CHAT_TYPES = {"private", "group", "supergroup", "channel", "sender"}
+# Поля с личными данными, которые не нужны для воспроизведения нагрузки
+DROPPED_KEYS = {"contact", "location", "venue", "photo", "voice", "video_note", "video", "audio",
+                "sticker", "animation", "author_signature", "forward_signature", "forward_sender_name"}
+# Свободный текст пользователя (и его эхо в сообщениях бота): заменяется заглушкой той же длины
+MASKED_TEXT_KEYS = {"text", "caption", "query", "url"}
+# Тексты кнопок обычных клавиатур бота — не личные данные, по ним идёт маршрутизация
+BUTTON_TEXTS = {
+    button.text
+    for markup in (get_main_keyboard(), admin_main_menu(), manage_courses_keyboard(), manage_resources_keyboard(),
+                   manage_terms_keyboard(), manage_groups_keyboard(), back_to_admin_panel_keyboard())
+    for row in markup.keyboard
+    for button in row
+}
+# Слова, которые роутеры сравнивают с текстом целиком (после strip().lower())
+ROUTING_KEYWORDS = {ALL_TERMS_KEYWORD}
+# Номер страницы в ответ на «перейти к странице»: короткое число сохраняется как есть
+MAX_KEPT_NUMBER_LENGTH = 4
+
+
+def pseudonym(value: int, salt: bytes = UPDATE_CAPTURE_SALT) -> int:
+    """Стабильный (при той же соли) псевдоним ID; знак сохраняется, чтобы группы оставались группами."""
+    digest = hashlib.blake2b(str(abs(value)).encode(), key=salt[:64], digest_size=6).digest()
+    number = int.from_bytes(digest, "big") or 1
+    return -number if value < 0 else number
+
+
+def _is_identity(value: Any) -> bool:
+    """Объект вида User или Chat: числовой id и имя, признак бота или тип чата."""
+    return (isinstance(value, dict) and isinstance(value.get("id"), int)
+            and ("first_name" in value or "is_bot" in value or value.get("type") in CHAT_TYPES))
+
+
+def _is_id_key(key: str) -> bool:
+    """Поля-ссылки на пользователя или чат: user_id, chat_id, contact.user_id, migrate_to_chat_id и т. п."""
+    return key in ("user_id", "chat_id") or key.endswith(("_user_id", "_chat_id"))
+
+
+def _anonymize_identity(identity: Dict[str, Any], salt: bytes) -> Dict[str, Any]:
+    anonymized = {"id": pseudonym(identity["id"], salt)}
+    if "type" in identity:
+        anonymized["type"] = identity["type"]
+    if "is_bot" in identity:
+        anonymized["is_bot"] = identity["is_bot"]
+    if "is_bot" in identity or "first_name" in identity:
+        anonymized["first_name"] = "User"
+    if identity.get("language_code"):
+        anonymized["language_code"] = identity["language_code"]
+    return anonymized
+
+
+def _mask(text: str) -> str:
+    """Заглушка той же длины (и тех же смещений entities): буквы -> «х»/«x», цифры -> «0»,
+    пробелы, знаки и эмодзи сохраняются, чтобы фильтры хэндлеров видели ту же форму текста."""
+    return "".join(
+        ("Х" if char.isupper() else "х") if "а" <= char.lower() <= "я" or char.lower() == "ё"
+        else ("X" if char.isupper() else "x") if char.isalpha()
+        else "0" if char.isdigit()
+        else char
+        for char in text
+    )
+
+
+def anonymize_text(text: str) -> str:
+    """Команда (/search), кнопки меню и слова маршрутизации («все») остаются как есть, аргументы
+    команды и прочий текст маскируются. Одиночный символ (поиск по букве) и короткий номер страницы
+    сохраняются: они нужны для воспроизведения и никого не выдают."""
+    if text in BUTTON_TEXTS or len(text) <= 1 or text.strip().lower() in ROUTING_KEYWORDS:
+        return text
+    if text.strip().isdigit() and len(text.strip()) <= MAX_KEPT_NUMBER_LENGTH:
+        return text
+    if text.startswith("/"):
+        command, separator, arguments = text.partition(" ")
+        return command + separator + _mask(arguments)
+    return _mask(text)
+
+
+def anonymize(value: Any, salt: bytes = UPDATE_CAPTURE_SALT) -> Any:
+    """Копия обновления без имён, username, контактов и свободного текста; ID пользователей и чатов —
+    псевдонимы. callback_data и форма inline-запроса (длина, offset) сохраняются."""
+    if isinstance(value, list):
+        return [anonymize(item, salt) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if _is_identity(value):
+        return _anonymize_identity(value, salt)
+    result = {}
+    for key, item in value.items():
+        if key in DROPPED_KEYS:
+            continue
+        if key in IDENTITY_KEYS and isinstance(item, dict) and "id" in item:
+            result[key] = _anonymize_identity(item, salt)
+        elif key in IDENTITY_KEYS and isinstance(item, list):
+            result[key] = [_anonymize_identity(entry, salt) if isinstance(entry, dict) and "id" in entry
+                           else anonymize(entry, salt) for entry in item]
+        elif _is_id_key(key) and isinstance(item, int):
+            result[key] = pseudonym(item, salt)
+        elif key == "user_ids" and isinstance(item, list):
+            result[key] = [pseudonym(entry, salt) if isinstance(entry, int) else entry for entry in item]
+        elif key == "chat_instance":
+            result[key] = hashlib.blake2b(str(item).encode(), key=salt[:64], digest_size=8).hexdigest()
+        elif key in MASKED_TEXT_KEYS and isinstance(item, str):
+            result[key] = anonymize_text(item)
+        elif key == "file_name" and isinstance(item, str):
+            stem, dot, extension = item.rpartition(".")
+            result[key] = _mask(stem) + dot + extension if dot else _mask(item)
+        else:
+            result[key] = anonymize(item, salt)
+    return result
+
+
+class UpdateCaptureMiddleware(BaseMiddleware):
+    """Outer-middleware обновлений: пишет каждое обновление строкой {"ts": ..., "update": {...}}
+    в файл с ротацией по размеру, до обработки (записываются и обновления, упавшие в хэндлере)."""
+
+    def __init__(self, path: str, max_bytes: int = UPDATE_CAPTURE_MAX_BYTES,
+                 backups: int = UPDATE_CAPTURE_BACKUPS, salt: bytes = UPDATE_CAPTURE_SALT):
+        self.salt = salt
+        self.capture_log = logging.getLogger(f"update_capture.{path}")
+        self.capture_log.setLevel(logging.INFO)
+        self.capture_log.propagate = False
+        if not self.capture_log.handlers:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.capture_log.addHandler(handler)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            try:
+                update = anonymize(event.model_dump(mode="json", exclude_none=True, by_alias=True), self.salt)
+                self.capture_log.info(json.dumps({"ts": time.time(), "update": update}, ensure_ascii=False))
+            except Exception as e:
+                logger.error(f"Ошибка записи обновления {event.update_id}: {e}")
+        return await handler(event, data)
+
+
+def setup_update_capture(dp: Dispatcher, path: str = UPDATE_CAPTURE_PATH) -> None:
+    """Включает запись обновлений, если задан UPDATE_CAPTURE_PATH."""
+    if not path:
+        return
+    dp.update.outer_middleware(UpdateCaptureMiddleware(path))
+    logger.info(f"Запись входящих обновлений в {path}")